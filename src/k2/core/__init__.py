@@ -1,21 +1,23 @@
 """
 核心业务逻辑模块
 """
-from .api import get_creator_profile, get_creator_tags, get_post_detail
+from .api import get_creator_profile, get_creator_tags, fetch_creator_tags, get_post_detail
 from .detector import detect_files_from_post, get_files_for_url
 from .downloader import download_file
-from .constants import DownloadState, DEFAULT_SETTINGS
+from .constants import DownloadState, DEFAULT_SETTINGS, MAX_DOWNLOAD_THREADS
 from .workers import DetectionWorker, TagFilterDownloadCoordinator
 
 __all__ = [
     'get_creator_profile',
     'get_creator_tags',
+    'fetch_creator_tags',
     'get_post_detail',
     'detect_files_from_post',
     'get_files_for_url',
     'download_file',
     'DownloadState',
     'DEFAULT_SETTINGS',
+    'MAX_DOWNLOAD_THREADS',
     'DetectionWorker',
     'TagFilterDownloadCoordinator',
 ]
@@ -3,8 +3,15 @@ API请求模块
 处理与Kemono/Coomer API的交互
 """
 import requests
-from typing import Optional, Dict, List
-from ..utils.network import make_robust_request, parse_json_response, get_domain_config
+from typing import Optional, Dict, List, Mapping, Tuple
+from ..utils.network import make_robust_request, parse_json_response, get_domain_config, build_api_headers
+
+
+def _conditional_headers(headers: Mapping[str, str], cached, etag: Optional[str]) -> Mapping[str, str]:
+    """存在本地缓存和 ETag 时添加 If-None-Match 请求头（共享的只读请求头不会被修改）"""
+    if cached and etag:
+        return {**headers, "If-None-Match": etag}
+    return headers
 
 
 def get_creator_profile(service: str, creator_id: str, domain_config: dict, cache_manager=None) -> dict:
@@ -19,26 +26,32 @@ def get_creator_profile(service: str, creator_id: str, domain_config: dict, cach
     Returns:
         包含创作者信息的字典
     """
-    # 尝试从缓存获取
+    # 从API获取
+    profile_api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/profile"
+    headers = build_api_headers(domain_config['referer'])
+    
+    cached_profile = None
     if cache_manager:
         cached_profile = cache_manager.get_cached_profile(service, creator_id)
-        if cached_profile:
+        # 刚确认过的缓存直接返回（同一次检测中多处需要作者信息时只请求一次）
+        if cached_profile and cache_manager.is_fresh(service, creator_id, 'profile'):
             return cached_profile
-    
-    # 从API获取
-    profile_api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/profile"
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json",
-        "Referer": domain_config['referer']
-    }
+        # 有缓存时发送条件请求，内容未变化时服务器返回 304，不再传输和解析响应体
+        headers = _conditional_headers(headers, cached_profile,
+                                       cache_manager.get_etag(service, creator_id, 'profile'))
     
     try:
         response = make_robust_request(profile_api_url, headers, max_retries=2, timeout=10)
         if not response:
+            if cached_profile:
+                return cached_profile
             print(f"⚠️ 无法获取创作者信息: {service}:{creator_id}")
             return {}
         
+        if response.status_code == 304 and cached_profile:
+            cache_manager.mark_fresh(service, creator_id, 'profile')
+            return cached_profile
+        
         profile_data = parse_json_response(response)
         if not isinstance(profile_data, dict):
             return {}
@@ -58,7 +71,9 @@ def get_creator_profile(service: str, creator_id: str, domain_config: dict, cach
         
         # 更新缓存
         if cache_manager:
+            cache_manager.set_etag(service, creator_id, 'profile', response.headers.get('ETag'))
             cache_manager.update_profile_cache(service, creator_id, creator_info)
+            cache_manager.mark_fresh(service, creator_id, 'profile')
         
         return creator_info
         
@@ -79,28 +94,50 @@ def get_creator_tags(service: str, creator_id: str, domain_config: dict, cache_m
     Returns:
         标签名称到帖子数量的字典
     """
-    # 尝试从缓存获取
+    cached_tags, etag = None, None
     if cache_manager:
         cached_tags = cache_manager.get_cached_tags(service, creator_id)
-        if cached_tags:
-            return cached_tags
+        etag = cache_manager.get_etag(service, creator_id, 'tags')
     
-    # 从API获取
+    tags_with_counts, new_etag, updated = fetch_creator_tags(service, creator_id, domain_config, cached_tags, etag)
+    
+    # 更新缓存
+    if cache_manager and updated:
+        cache_manager.set_etag(service, creator_id, 'tags', new_etag)
+        cache_manager.update_tags_cache(service, creator_id, tags_with_counts)
+    
+    return tags_with_counts
+
+
+def fetch_creator_tags(service: str, creator_id: str, domain_config: dict,
+                       cached_tags: Optional[Dict[str, int]] = None,
+                       etag: Optional[str] = None) -> Tuple[Dict[str, int], Optional[str], bool]:
+    """请求创作者标签，不访问缓存管理器，可在后台线程中调用
+    
+    Args:
+        service: 服务类型
+        creator_id: 创作者ID
+        domain_config: 域名配置
+        cached_tags: 本地缓存的标签（可选，与 etag 一起用于条件请求）
+        etag: 上次响应的 ETag（可选）
+        
+    Returns:
+        (标签字典, 响应的 ETag, 是否为新数据)；为新数据时由调用方写入缓存
+    """
     tags_api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/tags"
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json",
-        "Referer": domain_config['referer']
-    }
+    headers = _conditional_headers(build_api_headers(domain_config['referer']), cached_tags, etag)
     
     try:
         response = make_robust_request(tags_api_url, headers)
         if not response:
-            return {}
+            return cached_tags or {}, None, False
+        
+        if response.status_code == 304 and cached_tags:
+            return cached_tags, None, False
         
         tags_data = parse_json_response(response)
         if not isinstance(tags_data, list):
-            return {}
+            return {}, None, False
         
         # 提取标签名称和帖子数量
         tags_with_counts = {}
@@ -111,18 +148,15 @@ def get_creator_tags(service: str, creator_id: str, domain_config: dict, cache_m
                 if isinstance(post_count, int) and post_count > 0:
                     tags_with_counts[tag_name] = post_count
         
-        # 更新缓存
-        if cache_manager:
-            cache_manager.update_tags_cache(service, creator_id, tags_with_counts)
-        
-        return tags_with_counts
+        return tags_with_counts, response.headers.get('ETag'), True
         
     except Exception as e:
         print(f"获取创作者标签失败: {e}")
-        return {}
+        return {}, None, False
 
 
-def get_post_detail(service: str, creator_id: str, post_id: str, domain_config: dict) -> Optional[dict]:
+def get_post_detail(service: str, creator_id: str, post_id: str, domain_config: dict, cache_manager=None,
+                    headers: Optional[Mapping[str, str]] = None) -> Optional[dict]:
     """获取单个帖子的详细信息
     
     Args:
@@ -130,19 +164,28 @@ def get_post_detail(service: str, creator_id: str, post_id: str, domain_config:
         creator_id: 创作者ID
         post_id: 帖子ID
         domain_config: 域名配置
+        cache_manager: 缓存管理器（可选，用于记录返回 404 的帖子）
+        headers: 请求头（可选，默认使用 JSON API 请求头）
         
     Returns:
         帖子详细信息字典，失败返回None
     """
+    # 近期已确认不存在的帖子直接跳过
+    if cache_manager and cache_manager.is_missing(service, creator_id, post_id):
+        return None
+    
     api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/post/{post_id}"
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json",
-        "Referer": domain_config['referer']
-    }
+    if headers is None:
+        headers = build_api_headers(domain_config['referer'])
     
     response = make_robust_request(api_url, headers, max_retries=2, timeout=15)
-    if not response:
+    if response is None:
+        return None  # 超时、限流或服务器错误，下次仍需重新请求
+    
+    # 只有确认不存在（404）时才记录；验证页、截断或无法解析的响应体可能是临时故障，不屏蔽帖子
+    if response.status_code == 404:
+        if cache_manager:
+            cache_manager.mark_missing(service, creator_id, post_id)
         return None
     
     post_data = parse_json_response(response)
@@ -150,4 +193,3 @@ def get_post_detail(service: str, creator_id: str, post_id: str, domain_config:
         return None
     
     return post_data
-
@@ -3,9 +3,65 @@
 从帖子中检测和提取可下载的文件
 """
 import os
+import re
+import html
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
 from bs4 import BeautifulSoup
-from ..utils.network import get_domain_config, make_robust_request, parse_json_response, COMMON_HEADERS, extract_post_info
+try:
+    import lxml  # noqa: F401  C 实现的解析器，比 html.parser 快很多
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+from ..utils.network import get_domain_config, make_robust_request, parse_json_response, build_headers, extract_post_info, backoff_sleep
+
+
+# 帖子列表分页并发获取的线程数
+PAGE_FETCH_WORKERS = 8
+
+# 帖子正文中的 <img src="..."> 提取（常规 CDN 标记，无需构建完整 DOM）
+_IMG_SRC_RE = re.compile(r'<img\b[^>]*?\ssrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def _extract_img_srcs(content_html: str) -> List[str]:
+    """提取正文中所有图片地址，正则未能匹配每个 <img 时回退到 BeautifulSoup"""
+    srcs = _IMG_SRC_RE.findall(content_html)
+    if len(srcs) >= content_html.lower().count('<img'):
+        # 与 BeautifulSoup 一致，还原属性值中的 HTML 实体（如 &amp;）
+        return [html.unescape(src) for src in srcs]
+    
+    # 部分 <img 未被正则命中（属性无引号、无 src 等不规范写法），使用完整解析，避免漏掉图片
+    soup = BeautifulSoup(content_html, _HTML_PARSER)
+    return [img_tag.get("src") for img_tag in soup.select("img[src]")]
+
+
+# 去重时忽略的查询参数：站内图片的缩略图/尺寸参数，不改变实际指向的文件
+_DEDUP_IGNORED_QUERY_KEYS = frozenset(("w", "h", "width", "height", "size", "thumb", "thumbnail"))
+
+
+def _canon_path(path: str, site_prefix: str) -> str:
+    """规范化路径用于去重：去掉本站域名前缀、末尾斜杠和缩略图尺寸参数
+    
+    路径区分大小写，其他查询参数（如签名、?f= 下载参数）保留，避免把不同文件合并
+    """
+    base, _sep, query = path.partition('?')
+    # 域名不区分大小写，只对前缀部分做小写比较
+    if base[:len(site_prefix)].lower() == site_prefix:
+        base = base[len(site_prefix):]
+    base = base.rstrip('/')
+    if query:
+        kept = [p for p in query.split('&') if p.partition('=')[0].lower() not in _DEDUP_IGNORED_QUERY_KEYS]
+        if kept:
+            return base + '?' + '&'.join(kept)
+    return base
+
+
+def _get_ext(name: str) -> str:
+    """获取小写扩展名（含点），比 os.path.splitext 开销更小"""
+    head, dot, tail = name.rpartition('.')
+    if not dot or not head or not tail or '/' in tail or head.endswith('/'):
+        return ''
+    return '.' + tail.lower()
 
 
 def detect_files_from_post(post_data: dict, service_domain: str, allowed_extensions: set, source_filters: set) -> Tuple[dict, List[dict]]:
@@ -28,25 +84,34 @@ def detect_files_from_post(post_data: dict, service_domain: str, allowed_extensi
     published_date = post_info_data.get('published')
     tags = post_info_data.get('tags', []) or []
 
+    # 扩展名集合统一转为小写 frozenset（调用方已转换时直接复用）
+    if allowed_extensions and type(allowed_extensions) is not frozenset:
+        allowed_extensions = frozenset(e.lower() for e in allowed_extensions)
+
     files_list = []
     seen_paths = set()
+    # 每个帖子只格式化一次域名前缀，并缓存常用方法，减少逐文件的属性查找
+    url_prefix = f"https://{service_domain}"
+    site_prefix = url_prefix.lower()
+    append_file = files_list.append
+    mark_seen = seen_paths.add
 
     def _add_file(path, name):
         """内部辅助函数，用于处理和添加文件"""
         if not path or not isinstance(path, str):
             return
         
-        # 去重检查
-        if path in seen_paths:
+        # 去重检查（同一文件可能同时出现在附件和正文中，仅尺寸参数或域名前缀不同）
+        canon_path = _canon_path(path, site_prefix)
+        if canon_path in seen_paths:
             return
         
         file_name = name or os.path.basename(path)
-        ext = os.path.splitext(file_name)[1].lower()
+        ext = _get_ext(file_name)
         
         # 如果从文件名中无法获取扩展名，尝试从路径中获取
         if not ext:
-            path_clean = path.split('?')[0]
-            ext = os.path.splitext(path_clean)[1].lower()
+            ext = _get_ext(path.split('?', 1)[0])
             if ext:
                 file_name = file_name + ext
 
@@ -58,10 +123,10 @@ def detect_files_from_post(post_data: dict, service_domain: str, allowed_extensi
         if path.startswith(('http://', 'https://')):
             url = path
         else:
-            url = f"https://{service_domain}{path}"
+            url = url_prefix + path
         
-        files_list.append({'url': url, 'name': file_name})
-        seen_paths.add(path)
+        append_file({'url': url, 'name': file_name})
+        mark_seen(canon_path)
 
     # 1. 处理 post['file']
     if "file" in source_filters:
@@ -71,18 +136,19 @@ def detect_files_from_post(post_data: dict, service_domain: str, allowed_extensi
 
     # 2. 处理 post['attachments']
     if "attachments" in source_filters:
-        for attachment in post_info_data.get("attachments", []):
-            if isinstance(attachment, dict):
-                _add_file(attachment.get("path"), attachment.get("name"))
+        # API 返回的附件均为普通 dict，用 type() is 判断比 isinstance 更快
+        for attachment in post_info_data.get("attachments") or ():
+            if type(attachment) is dict:
+                path = attachment.get("path")
+                if path:
+                    _add_file(path, attachment.get("name"))
 
     # 3. 处理 post['content'] 中的图片
     if "content" in source_filters:
         content_html = post_info_data.get("content")
         if content_html:
             try:
-                soup = BeautifulSoup(content_html, "html.parser")
-                for img_tag in soup.select("img[src]"):
-                    src = img_tag.get("src")
+                for src in _extract_img_srcs(content_html):
                     # 忽略 base64 编码的图片
                     if src and not src.startswith('data:image'):
                         _add_file(src, os.path.basename(src))
@@ -137,8 +203,7 @@ def get_files_for_url(url: str, extensions: set, source_filters: set):
         if is_creator:
             # 处理创作者 URL - 获取所有帖子
             base_api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}"
-            headers = COMMON_HEADERS.copy()
-            headers["Referer"] = domain_config['referer']
+            headers = build_headers(domain_config['referer'])
 
             posts_per_page = 50
             
@@ -153,20 +218,14 @@ def get_files_for_url(url: str, extensions: set, source_filters: set):
             
             # 步骤2: 获取缓存中的帖子数量
             cached_post_count = cache.get_cached_post_count(service, creator_id)
-            cached_posts = cache.get_cached_posts(service, creator_id, offset=0)
+            has_cached_posts = cache.get_posts_count(service, creator_id) > 0
             
             # 步骤3: 判断是否需要更新
-            if cached_post_count == total_posts_on_server and cached_posts:
-                # 缓存数量与服务器一致，直接使用缓存
-                # 分批产出缓存的帖子数据
-                BATCH_SIZE = 100
-                for i in range(0, len(cached_posts), BATCH_SIZE):
-                    batch = cached_posts[i:i + BATCH_SIZE]
-                    for post_summary in batch:
-                        if isinstance(post_summary, dict) and "id" in post_summary:
-                            yield post_summary
-                    import time
-                    time.sleep(0.001)
+            if cached_post_count == total_posts_on_server and has_cached_posts:
+                # 缓存数量与服务器一致，直接逐个产出缓存的帖子数据
+                for post_summary in cache.iter_cached_posts(service, creator_id):
+                    if isinstance(post_summary, dict) and "id" in post_summary:
+                        yield post_summary
                 return
             
             # 步骤4: 需要从API获取数据（全新或增量更新）
@@ -174,74 +233,71 @@ def get_files_for_url(url: str, extensions: set, source_filters: set):
             posts_to_fetch = total_posts_on_server - cached_post_count if cached_post_count > 0 else total_posts_on_server
             
             # 如果有缓存，先产出缓存的帖子
-            if cached_posts and cached_post_count > 0:
-                BATCH_SIZE = 100
-                for i in range(0, len(cached_posts), BATCH_SIZE):
-                    batch = cached_posts[i:i + BATCH_SIZE]
-                    for post_summary in batch:
-                        if isinstance(post_summary, dict) and "id" in post_summary:
-                            yield post_summary
-                    import time
-                    time.sleep(0.001)
+            if has_cached_posts and cached_post_count > 0:
+                for post_summary in cache.iter_cached_posts(service, creator_id):
+                    if isinstance(post_summary, dict) and "id" in post_summary:
+                        yield post_summary
             
             # 从API获取新帖子（增量或全量）
-            offset = 0
+            # 总数已知，按 offset 并发请求各页，再按 offset 顺序产出
             collected_new_posts = []
             max_retries_per_page = 3
             consecutive_failures = 0
             max_consecutive_failures = 5
             
-            # 增量更新：只获取差额部分
-            while len(collected_new_posts) < posts_to_fetch:
-                list_api_url = f"{base_api_url}/posts?o={offset}"
-                
-                # 带重试的页面获取
-                page_post_summaries = None
+            def fetch_page(page_offset):
+                """带重试的页面获取，失败返回 None"""
+                list_api_url = f"{base_api_url}/posts?o={page_offset}"
+                backoff = None
                 for attempt in range(max_retries_per_page):
                     response = make_robust_request(list_api_url, headers)
                     
                     if response:
-                        page_post_summaries = parse_json_response(response)
-                        if isinstance(page_post_summaries, list):
-                            consecutive_failures = 0
-                            break
+                        page = parse_json_response(response)
+                        if isinstance(page, list):
+                            return page
                     
                     # 重试前等待
                     if attempt < max_retries_per_page - 1:
-                        import time
-                        wait_time = 2 ** attempt
-                        time.sleep(wait_time)
-                
-                # 检查是否获取成功
-                if not page_post_summaries or not isinstance(page_post_summaries, list):
-                    consecutive_failures += 1
+                        backoff = backoff_sleep(backoff)
+                return None
+            
+            # 增量更新：只获取差额部分
+            offsets = range(0, max(posts_to_fetch, 0), posts_per_page)
+            executor = ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS)
+            try:
+                # map 按提交顺序返回结果，保证缓存与产出顺序与串行获取一致
+                for page_post_summaries in executor.map(fetch_page, offsets):
+                    # 检查是否获取成功
+                    if page_post_summaries is None:
+                        consecutive_failures += 1
+                        if consecutive_failures >= max_consecutive_failures:
+                            break
+                        continue
                     
-                    if consecutive_failures >= max_consecutive_failures:
+                    consecutive_failures = 0
+                    
+                    # 成功获取数据
+                    if not page_post_summaries:
                         break
                     
-                    offset += posts_per_page
-                    continue
-                
-                # 成功获取数据
-                if not page_post_summaries:
-                    break
-                
-                collected_new_posts.extend(page_post_summaries)
-                
-                # 产出新帖子数据
-                for post_summary in page_post_summaries:
-                    if isinstance(post_summary, dict) and "id" in post_summary:
-                        yield post_summary
-                
-                # 检查是否获取完整
-                if len(page_post_summaries) < posts_per_page:
-                    break
-                
-                offset += posts_per_page
+                    collected_new_posts.extend(page_post_summaries)
+                    
+                    # 产出新帖子数据
+                    for post_summary in page_post_summaries:
+                        if isinstance(post_summary, dict) and "id" in post_summary:
+                            yield post_summary
+                    
+                    # 检查是否获取完整
+                    if len(page_post_summaries) < posts_per_page or len(collected_new_posts) >= posts_to_fetch:
+                        break
+            finally:
+                # 提前结束时取消尚未开始的页面请求
+                executor.shutdown(wait=False, cancel_futures=True)
             
             # 更新缓存（去重合并）
             if collected_new_posts:
-                cache.update_posts_cache(service, creator_id, collected_new_posts, offset, delay_save=True)
+                cache.update_posts_cache(service, creator_id, collected_new_posts, delay_save=True)
             
             # 更新缓存的帖子数量
             final_cached_count = cached_post_count + len(collected_new_posts)
@@ -253,13 +309,17 @@ def get_files_for_url(url: str, extensions: set, source_filters: set):
         elif is_post:
             # 处理单个帖子 URL
             from ..core.api import get_creator_profile
-            creator_name = get_creator_profile(service, creator_id, domain_config).get('name', creator_id)
 
             api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/post/{post_id}"
-            headers = COMMON_HEADERS.copy()
-            headers["Referer"] = domain_config['referer']
+            headers = build_headers(domain_config['referer'])
+
+            # 作者信息与帖子数据互不依赖，同时请求
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                profile_future = executor.submit(get_creator_profile, service, creator_id, domain_config)
+                post_future = executor.submit(make_robust_request, api_url, headers)
+                creator_name = (profile_future.result() or {}).get('name', creator_id)
+                response = post_future.result()
 
-            response = make_robust_request(api_url, headers)
             if not response:
                 print(f"⚠️ 单个帖子API请求失败: {api_url}")
                 return
@@ -3,13 +3,121 @@
 处理文件下载、断点续传、重试等
 """
 import os
+import sys
 import time
+import ctypes
+import threading
 import requests
-from ..utils.network import get_session
+from ..utils.network import get_session, backoff_sleep
+
+
+# 读取缓冲区大小：默认 256 KiB，大文件（>100 MiB）使用 1 MiB，减少 Python 层循环和系统调用次数
+DEFAULT_CHUNK_SIZE = 256 * 1024
+LARGE_FILE_CHUNK_SIZE = 1024 * 1024
+LARGE_FILE_THRESHOLD = 100 * 1024 * 1024
+
+# 进度回调的最小间隔（秒），避免高速下载时产生大量 UI 信号
+PROGRESS_INTERVAL = 0.05
+
+# 等待大文件下载名额时检查取消事件的间隔（秒）
+LARGE_FILE_WAIT_POLL = 0.5
+
+# Linux fallocate(2) 的 FALLOC_FL_KEEP_SIZE：只预留磁盘块，不改变文件长度
+_FALLOC_FL_KEEP_SIZE = 0x01
+_fallocate = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _fallocate = getattr(_libc, 'fallocate64', None) or _libc.fallocate
+        _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+        _fallocate.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _fallocate = None
+
+
+def _preallocate(f, offset: int, length: int):
+    """为即将写入的区间预留磁盘空间，减少追加写入时的碎片和元数据更新
+    
+    不使用 os.posix_fallocate：它会把文件扩展到最终大小，
+    进程中途退出后 .part 文件长度将不再等于已下载字节数，破坏断点续传。
+    """
+    if _fallocate is None or length <= 0:
+        return
+    try:
+        f.flush()
+        # 文件系统不支持时返回错误，忽略即可
+        _fallocate(f.fileno(), _FALLOC_FL_KEEP_SIZE, offset, length)
+    except Exception:
+        pass
+
+
+class DownloadDeferred(Exception):
+    """由 on_headers 回调抛出：放弃本次请求（响应随即关闭，不计入重试），由调用方稍后重新下载"""
+
+
+class LargeFileGate:
+    """大文件下载名额：超过阈值的文件同一时间最多下载 limit 个
+    
+    响应头到达后才知道文件大小。名额被占用时关闭当前响应再等待，
+    等待期间不占用连接，也不会因长时间不读取而被服务器断开；
+    等待可被取消事件打断，获得名额后重新请求。
+    注意等待发生在调用线程中，线程池中的该线程在等待期间仍被占用。
+    """
+    
+    def __init__(self, threshold: int, limit: int = 1):
+        self.threshold = threshold
+        self._semaphore = threading.BoundedSemaphore(limit)
+    
+    def _wait(self, cancel_event):
+        """等待名额，取消事件触发时抛出 InterruptedError"""
+        while True:
+            if cancel_event and cancel_event.is_set():
+                raise InterruptedError("下载被用户暂停。")
+            if self._semaphore.acquire(timeout=LARGE_FILE_WAIT_POLL):
+                return
+    
+    def download(self, url: str, dest_path: str, headers: dict, cancel_event=None,
+                 state: dict = None, on_release=None, **kwargs) -> tuple[str | None, str | None]:
+        """调用 download_file 下载，大文件需持有名额
+        
+        Args:
+            state: 调用方的状态字典，获得名额后 state['large'] 为 True（供进度回调使用）
+            on_release: 释放名额前的回调（可选），用于清理大文件状态，避免与下一个大文件交错
+            其他参数同 download_file
+        """
+        if state is None:
+            state = {}
+        state['large'] = False
+        
+        def on_headers(total_bytes):
+            # 重试时会再次回调，已持有名额则不重复获取
+            if state['large'] or total_bytes <= self.threshold:
+                return
+            if not self._semaphore.acquire(blocking=False):
+                raise DownloadDeferred()
+            print(f"📦 大文件检测: {os.path.basename(dest_path)} ({total_bytes / (1024 * 1024):.1f}MB) - 使用串行下载")
+            state['large'] = True
+        
+        try:
+            while True:
+                try:
+                    return download_file(url, dest_path, headers, cancel_event=cancel_event,
+                                         on_headers=on_headers, **kwargs)
+                except DownloadDeferred:
+                    print(f"⏳ 等待其他大文件下载完成: {os.path.basename(dest_path)}")
+                    self._wait(cancel_event)
+                    state['large'] = True
+        finally:
+            if state['large']:
+                try:
+                    if on_release:
+                        on_release()
+                finally:
+                    self._semaphore.release()
 
 
 def get_file_size(url: str, headers: dict, timeout: int = 10) -> int:
-    """通过HEAD请求获取文件大小
+    """通过HEAD请求获取文件大小，HEAD 不可用时回退到 Range: bytes=0-0 请求
     
     Args:
         url: 文件URL
@@ -19,24 +127,36 @@ def get_file_size(url: str, headers: dict, timeout: int = 10) -> int:
     Returns:
         文件大小（字节），如果无法获取则返回0
     """
+    session = get_session()
     try:
-        session = get_session()
-        response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
-        response.raise_for_status()
-        
-        # 尝试从 Content-Length 头获取文件大小
-        content_length = response.headers.get('Content-Length')
-        if content_length:
-            return int(content_length)
-        
-        return 0
-    except Exception as e:
-        # 如果HEAD请求失败，返回0（将被视为小文件）
-        return 0
+        # 使用 with 及时把连接归还连接池
+        with session.head(url, headers=headers, timeout=timeout, allow_redirects=True) as response:
+            response.raise_for_status()
+            
+            # 尝试从 Content-Length 头获取文件大小
+            content_length = response.headers.get('Content-Length')
+            if content_length:
+                return int(content_length)
+    except Exception:
+        pass
+    
+    try:
+        # 部分服务器拒绝 HEAD，只请求第一个字节，从 Content-Range 中读取总大小
+        range_headers = {**headers, "Range": "bytes=0-0"}
+        with session.get(url, headers=range_headers, timeout=timeout, stream=True) as response:
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            if response.status_code == 206 and total.isdigit():
+                return int(total)
+    except Exception:
+        pass
+    
+    # 无法获取时返回0（将被视为小文件）
+    return 0
 
 
 def download_file(url: str, dest_path: str, headers: dict, max_retries: int = None, 
-                 chunk_size: int = 8192, cancel_event=None, progress_callback=None, retry_callback=None) -> tuple[str | None, str | None]:
+                 chunk_size: int = None, cancel_event=None, progress_callback=None, retry_callback=None,
+                 on_headers=None) -> tuple[str | None, str | None]:
     """下载文件到指定完整路径，支持重试、断点续传和原子性保存
     
     Args:
@@ -44,10 +164,12 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
         dest_path: 目标保存路径
         headers: HTTP请求头
         max_retries: 最大重试次数
-        chunk_size: 下载块大小
+        chunk_size: 下载块大小（默认按文件大小自动选择）
         cancel_event: 取消事件
         progress_callback: 进度回调函数
         retry_callback: 重试回调函数 (attempt, is_retrying)
+        on_headers: 收到响应头后的回调函数 (total_bytes)，每次尝试都会调用；
+            抛出 DownloadDeferred 时关闭响应并原样抛出
         
     Returns:
         (下载成功的文件路径, 错误信息) 元组
@@ -64,9 +186,12 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
     os.makedirs(dest_folder, exist_ok=True)
     filename = os.path.basename(dest_path)
     part_path = dest_path + ".part"
+    # 整个下载（含重试）复用同一个共享会话的连接池
+    session = get_session()
 
     # 下载循环
     attempt = 1
+    backoff = None
     while True:
         try:
             headers_for_request = headers.copy()
@@ -79,7 +204,6 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
                 open_mode = "ab"
                 print(f"检测到部分文件，从 {downloaded_size} 字节处续传: {filename}")
 
-            session = get_session()
             with session.get(url, headers=headers_for_request, stream=True, timeout=30) as r:
                 r.raise_for_status()
 
@@ -89,20 +213,49 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
                     open_mode = "wb"
                 
                 # 获取总文件大小
-                total_size = int(r.headers.get('Content-Length', 0))
+                content_length = int(r.headers.get('Content-Length', 0))
+                total_size = content_length
                 if downloaded_size > 0 and total_size > 0:
                     total_size += downloaded_size
                 
+                if on_headers:
+                    on_headers(total_size)
+                
+                read_size = chunk_size or (
+                    LARGE_FILE_CHUNK_SIZE if total_size > LARGE_FILE_THRESHOLD else DEFAULT_CHUNK_SIZE
+                )
+                # 直接从底层连接按块读取，绕过 iter_content 的包装；仍按 Content-Encoding 解码
+                # stream() 以连接是否读完判断结束，解压过程中的空块不会被误当作 EOF
+                raw = r.raw
+                
+                report_progress = progress_callback if total_size > 0 else None
+                last_report = 0.0
+                
                 with open(part_path, open_mode) as f:
-                    for chunk in r.iter_content(chunk_size=chunk_size):
+                    if total_size > LARGE_FILE_CHUNK_SIZE:
+                        _preallocate(f, downloaded_size, total_size - downloaded_size)
+                    write = f.write
+                    for chunk in raw.stream(read_size, decode_content=True):
                         if cancel_event and cancel_event.is_set():
                             raise InterruptedError("下载被用户暂停。")
-                        f.write(chunk)
+                        write(chunk)
                         downloaded_size += len(chunk)
                         
-                        # 调用进度回调
-                        if progress_callback and total_size > 0:
-                            progress_callback(downloaded_size, total_size)
+                        # 调用进度回调（限制频率）
+                        if report_progress:
+                            now = time.monotonic()
+                            if now - last_report >= PROGRESS_INTERVAL:
+                                last_report = now
+                                report_progress(downloaded_size, total_size)
+                
+                # 核对实际接收的字节数（tell() 按传输字节计，与 Content-Length 一致），
+                # 连接提前结束时保留 .part 并重试续传，避免把截断的文件当作完整文件保存
+                if content_length and raw.tell() != content_length:
+                    raise IOError(f"下载不完整: 已接收 {raw.tell()} / {content_length} 字节")
+                
+                # 保证最终进度一定会上报
+                if report_progress:
+                    report_progress(downloaded_size, total_size)
             
             os.replace(part_path, dest_path)
             # 成功下载，通知不再重试
@@ -110,7 +263,7 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
                 retry_callback(attempt, False)
             return dest_path, None
 
-        except InterruptedError:
+        except (InterruptedError, DownloadDeferred):
             raise
         except requests.exceptions.HTTPError as e:
             # 检查是否已暂停
@@ -127,8 +280,7 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
             # 通知正在重试
             if retry_callback:
                 retry_callback(attempt, True)
-            sleep_time = min(2 ** min(attempt, 6), 60)
-            time.sleep(sleep_time)
+            backoff = backoff_sleep(backoff, cap=60, base=2.0)
             attempt += 1
         except Exception as e:
             # 检查是否已暂停
@@ -139,7 +291,6 @@ def download_file(url: str, dest_path: str, headers: dict, max_retries: int = No
             # 通知正在重试
             if retry_callback:
                 retry_callback(attempt, True)
-            sleep_time = min(2 ** min(attempt, 6), 60)
-            time.sleep(sleep_time)
+            backoff = backoff_sleep(backoff, cap=60, base=2.0)
             attempt += 1
 
@@ -2,26 +2,95 @@
 后台工作线程
 """
 import os
+import re
 import time
+import queue
+import itertools
+import collections
 import concurrent.futures
 import threading
-from PyQt6.QtCore import QThread, pyqtSignal
+import traceback
+from sys import intern
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
 
 from ..utils.i18n import get_text, _
 from ..utils.network import (
-    COMMON_HEADERS, make_robust_request, parse_json_response,
-    get_domain_config, extract_post_info, extract_creator_info
+    COMMON_HEADERS, build_headers,
+    get_domain_config, extract_post_info, extract_creator_info, get_session,
+    DOMAINS, COOMER_SERVICES
 )
 from ..utils.formatters import format_name_from_template
+from ..utils.cache import get_cache_manager
 from ..core.detector import detect_files_from_post
-from ..core.api import get_creator_profile as get_creator_info, get_creator_tags as get_creator_tags_with_counts
-from ..core.downloader import download_file, get_file_size
+from ..core.api import get_creator_profile as get_creator_info, fetch_creator_tags, get_post_detail
+from ..core.downloader import LargeFileGate
+from ..core.constants import MAX_DOWNLOAD_THREADS
 
 
-def _get_creator_name(service: str, creator_id: str, domain_config: dict) -> str:
-    """获取创作者名称"""
-    creator_info = get_creator_info(service, creator_id, domain_config)
-    return creator_info.get('name', creator_id)
+# 标签过滤时并发获取帖子详情的线程数
+DETAIL_FETCH_WORKERS = 8
+
+# 帖子详情最多预取的数量（已提交但尚未被协调线程取走），限制内存中的详情数据
+DETAIL_PREFETCH_WINDOW = DETAIL_FETCH_WORKERS * 2
+
+# 下载摘要中列出的失败文件数上限
+MAX_REPORTED_FAILURES = 20
+
+# 协调线程每批处理的已完成任务数
+COMPLETION_BATCH_SIZE = 32
+
+# 下载进度信号的合并发送间隔（毫秒）
+PROGRESS_FLUSH_INTERVAL_MS = 50
+
+# 下载统计信号的发送间隔（毫秒）
+STATS_FLUSH_INTERVAL_MS = 200
+
+
+class ShardedProgress:
+    """按 URL 分片加锁的下载进度表
+    
+    进度回调远多于读取，每次更新只锁定 URL 所在的分片；
+    每个分片维护自己的进度合计，读取总进度时只需汇总各分片。
+    """
+    SHARDS = 16
+    
+    def __init__(self):
+        # 每个分片: [锁, {url: (downloaded, total)}, 已下载合计, 总大小合计]
+        self._shards = [[threading.Lock(), {}, 0, 0] for _ in range(self.SHARDS)]
+    
+    def _shard(self, url: str) -> list:
+        return self._shards[hash(url) & (self.SHARDS - 1)]
+    
+    def set(self, url: str, downloaded: int, total: int):
+        """更新单个文件的进度，并按差值调整分片合计"""
+        shard = self._shard(url)
+        with shard[0]:
+            last_downloaded, last_total = shard[1].get(url, (0, 0))
+            shard[1][url] = (downloaded, total)
+            shard[2] += downloaded - last_downloaded
+            shard[3] += total - last_total
+    
+    def pop(self, url: str):
+        """移除文件进度，并从分片合计中扣除"""
+        shard = self._shard(url)
+        with shard[0]:
+            last_downloaded, last_total = shard[1].pop(url, (0, 0))
+            shard[2] -= last_downloaded
+            shard[3] -= last_total
+    
+    def totals(self) -> tuple:
+        """返回所有文件的 (已下载, 总大小) 合计"""
+        downloaded = total = 0
+        for shard in self._shards:
+            with shard[0]:
+                downloaded += shard[2]
+                total += shard[3]
+        return downloaded, total
+
+
+def _get_domain_config_for_service(service: str) -> dict:
+    """根据服务类型返回对应的域名配置"""
+    return DOMAINS['coomer'] if service in COOMER_SERVICES else DOMAINS['kemono']
 
 
 # Worker for detecting files from a URL
@@ -58,18 +127,30 @@ class DetectionWorker(QThread):
                 is_creator_url = True
             domain_config = get_domain_config(self.url)
 
-            # 如果是创作者URL，获取并发送作者详细信息
+            # 标签与帖子列表互不依赖，在后台线程获取，与帖子分页请求重叠
+            # 缓存管理器不是线程安全的：本线程读出缓存的标签和 ETag 传给后台请求，
+            # 标签未变化时服务器返回 304；结果回到本线程后再写入缓存
+            cache = get_cache_manager()
+            meta_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="detect-tags"
+            )
+            tags_future = meta_executor.submit(
+                fetch_creator_tags, service, creator_id, domain_config,
+                cache.get_cached_tags(service, creator_id), cache.get_etag(service, creator_id, 'tags')
+            )
+            meta_executor.shutdown(wait=False)
+
+            # 如果是创作者URL，获取并发送作者详细信息（同时用于帖子的作者名）
             total_posts = 0
+            creator_name = None
             if is_creator_url:
-                creator_info = get_creator_info(service, creator_id, domain_config)
+                creator_info = get_creator_info(service, creator_id, domain_config,
+                                                cache_manager=cache)
+                creator_name = creator_id
                 if creator_info:
                     self.creator_info_detected.emit(creator_info)
                     total_posts = creator_info.get('post_count', 0)
-
-            # Get creator tags for both creator URLs and post URLs
-            creator_tags_with_counts = get_creator_tags_with_counts(service, creator_id, domain_config)
-            creator_tags = set(creator_tags_with_counts.keys())
-            # Store creator tags for later use
+                    creator_name = creator_info.get('name', creator_id)
 
             # get_files_for_url yields raw post JSONs for creator URLs,
             # and pre-processed dicts for single post URLs.
@@ -77,9 +158,11 @@ class DetectionWorker(QThread):
             last_update_time = 0
             
             # 预处理所有帖子数据（在worker线程中），避免在主线程UI中处理大量数据导致栈溢出
-            creator_name = None
-            if is_creator_url:
-                creator_name = _get_creator_name(service, creator_id, domain_config)
+            # 循环内不变的参数提前计算，避免每个帖子重复构造
+            service_domain = domain_config['base_url'].replace('https://', '')
+            service_display = service.capitalize()
+            no_ext_filter = frozenset()  # 检测所有文件类型
+            all_sources = frozenset(("file", "attachments", "content"))
             
             # 使用try-except包裹迭代，捕获潜在错误
             try:
@@ -94,16 +177,17 @@ class DetectionWorker(QThread):
                         # 原始数据，在worker线程中预处理
                         try:
                             post_details, files = detect_files_from_post(
-                                raw_data, 
-                                domain_config['base_url'].replace('https://', ''), 
-                                set(),  # 检测所有文件类型
-                                {"file", "attachments", "content"}
+                                raw_data, service_domain, no_ext_filter, all_sources
                             )
                             
                             # 显示所有帖子，即使没有文件（保持与网页顺序一致）
                             post_details['post_title'] = post_details.pop('title', None)
+                            # 同一作者的标签在各帖子间大量重复，驻留后所有帖子共享同一字符串
+                            tags = post_details.get('tags')
+                            if tags:
+                                post_details['tags'] = [intern(t) if type(t) is str else t for t in tags]
                             post_info = {
-                                "service": service.capitalize(), 
+                                "service": service_display, 
                                 "creator_id": creator_id, 
                                 "creator_name": creator_name,
                                 "post_id": post_details.pop('id', None),
@@ -118,18 +202,22 @@ class DetectionWorker(QThread):
                     collected_count += 1
                     
                     # 每50个帖子或每0.5秒更新一次进度（避免过于频繁）
-                    current_time = time.time()
+                    current_time = time.monotonic()
                     if collected_count % 50 == 0 or (current_time - last_update_time) >= 0.5:
                         self.progress_update.emit(collected_count, total_posts)
                         last_update_time = current_time
             except Exception as iteration_error:
                 print(f"❌ 迭代获取文件时发生错误: {iteration_error}")
-                import traceback
                 traceback.print_exc()
             
+            # Get creator tags for both creator URLs and post URLs
+            creator_tags_with_counts, tags_etag, tags_updated = tags_future.result()
+            creator_tags = set(creator_tags_with_counts.keys())
+            if tags_updated:
+                cache.set_etag(service, creator_id, 'tags', tags_etag)
+                cache.update_tags_cache(service, creator_id, creator_tags_with_counts)
+            
             # 检测完成后保存缓存
-            from ..utils.cache import get_cache_manager
-            cache = get_cache_manager()
             cache.flush_pending_cache()
             
             # 存储数据到实例属性（避免通过信号传递大数据导致栈溢出）
@@ -148,7 +236,6 @@ class DetectionWorker(QThread):
 class TagFilterDownloadCoordinator(QThread):
     finished = pyqtSignal()
     error = pyqtSignal(str)
-    file_completed = pyqtSignal(str)  # url of the completed file
     progress_update = pyqtSignal(str)  # progress message
     stats_update = pyqtSignal(int, int)  # downloaded_files_count, processed_posts_count
     download_summary = pyqtSignal(dict)  # 下载完成后的统计信息 {success, failed, failed_files}
@@ -156,111 +243,235 @@ class TagFilterDownloadCoordinator(QThread):
 
     def __init__(self, detected_files_data: list, tag_filter_enabled: bool, selected_tags: set, 
                  allowed_exts: set, download_settings: dict, 
-                 pause_event, tags_with_counts: dict = None, start_post_id: str = "", end_post_id: str = "", parent=None):
+                 pause_event, tags_with_counts: dict = None, start_post_id: str = "", end_post_id: str = "",
+                 detected_extensions: set = None, parent=None):
         super().__init__(parent)
         self.detected_files_data = detected_files_data
         self.tag_filter_enabled = tag_filter_enabled
         self.selected_tags = selected_tags
         self.allowed_exts = allowed_exts
+        # 扩展名匹配在每个文件上执行，预先整理为小写集合
+        self._allowed_exts_frozen = frozenset(e.lower() for e in allowed_exts or ())
+        self._numeric_ext_mode = ".001" in self._allowed_exts_frozen
+        # 同样的规则编译为一个正则，直接匹配文件名结尾，省去逐个 splitext/lower
+        ext_pattern = self._build_ext_pattern()
+        self._ext_re = re.compile(ext_pattern, re.IGNORECASE) if ext_pattern else None
+        # 多行模式用于在换行拼接的多个文件名中一次性搜索
+        self._ext_re_lines = re.compile(ext_pattern, re.IGNORECASE | re.MULTILINE) if ext_pattern else None
         self.download_settings = download_settings
         self.pause_event = pause_event
         self.tags_with_counts = tags_with_counts or {}
         self.start_post_id = start_post_id
         self.end_post_id = end_post_id
+        # 检测阶段已收集的全部扩展名，用于快速判断是否存在可下载文件
+        self.detected_extensions = detected_extensions
+        
+        # 同一批帖子来自同一作者，域名配置、请求头和帖子API地址模板只需计算一次
+        first_post_info = detected_files_data[0].get("post_info", {}) if detected_files_data else {}
+        self._service = first_post_info.get('service', '').lower()  # API 路径使用小写服务名
+        self._domain_config = _get_domain_config_for_service(self._service)
+        self._service_domain = self._domain_config['base_url'].replace('https://', '')
+        self._detail_headers = build_headers(self._domain_config['referer'])
+        # 记录确认不存在的帖子，重复下载时不再请求其详情
+        self._cache_manager = get_cache_manager()
         
-        # UI批量更新优化
-        self.ui_update_batch_size = 5  # 每5个文件更新一次UI
-        self.ui_update_interval = 1000  # 1秒强制更新一次
-        self.last_ui_update = 0
-        self.last_downloaded_count = 0
-        self.last_processed_count = 0
+        # 统计数据由协调线程直接更新，界面定时读取 (downloaded_files_count, matched_posts_count)
+        self._stats = (0, 0)
+        self._last_emitted_stats = None
         
         # 大文件下载控制（50MB阈值）
         self.large_file_threshold = 50 * 1024 * 1024  # 50MB in bytes
-        self.large_file_future = None  # 当前正在下载的大文件的future对象
+        self.large_file_gate = LargeFileGate(self.large_file_threshold)  # 同一时间只下载一个大文件
         self.current_large_file_lock = threading.Lock()
         self.current_large_file_progress = None  # (downloaded, total)
         self.retry_count = 0  # 正在重试的文件数
         
         # 跟踪所有文件的下载进度
-        self.all_files_progress = {}  # {url: (downloaded, total)}
-        self.all_files_progress_lock = threading.Lock()
+        # 进度合计随每次回调增量维护，读取时无需遍历
+        self.all_files_progress = ShardedProgress()
         
         # 跟踪正在重试的文件
         self.retrying_files = set()  # 正在重试的文件URL集合
         self.retrying_files_lock = threading.Lock()
+        
+        # 标签过滤时预取帖子详情的线程池
+        self._detail_executor = None
+        
+        # 进度信号合并发送：定时器属于主线程，随下载线程启动/结束而启停
+        self._last_progress_state = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(PROGRESS_FLUSH_INTERVAL_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+        self.started.connect(self._progress_timer.start)
+        self.finished.connect(self._progress_timer.stop)
+        
+        # 统计信号同样由主线程定时发送，完成大量小文件时不会逐个发送信号
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(STATS_FLUSH_INTERVAL_MS)
+        self._stats_timer.timeout.connect(self._flush_stats)
+        self.started.connect(self._stats_timer.start)
+        self.finished.connect(self._stats_timer.stop)
     
     def is_ext_match(self, file_ext: str) -> bool:
         """
         判断文件扩展名是否匹配过滤器
         如果allowed_exts包含.001，则.001-.999都会被匹配
         """
-        # 直接匹配
-        if file_ext in self.allowed_exts:
-            return True
+        # 直接匹配；或.001在过滤器中时，匹配3位数字扩展名（.001-.999）
+        return file_ext in self._allowed_exts_frozen or (
+            self._numeric_ext_mode and len(file_ext) == 4
+            and file_ext[0] == "." and file_ext[1:].isdigit()
+        )
+
+    def _build_ext_pattern(self):
+        """将允许的扩展名规则转为匹配文件名结尾的正则表达式，无可匹配扩展名时返回None"""
+        alternatives = [re.escape(e[1:]) for e in self._allowed_exts_frozen if e.startswith(".") and len(e) > 1]
+        if self._numeric_ext_mode:
+            alternatives.append(r"\d{3}")
+        if not alternatives:
+            return None
+        # 点号前至少有一个字符，与 splitext 对隐藏文件的处理一致
+        return r"(?<=.)\.(?:" + "|".join(alternatives) + r")$"
+
+    def _select_posts_in_range(self) -> list:
+        """按起止帖子ID截取需要处理的帖子（包含起止帖子本身）"""
+        posts = self.detected_files_data
+        start_index = 0
+        if self.start_post_id:
+            start_index = next(
+                (i for i, post_data in enumerate(posts)
+                 if str(post_data.get("post_info", {}).get('post_id', '')) == self.start_post_id),
+                len(posts)  # 未找到起始ID时不处理任何帖子
+            )
         
-        # 如果.001在过滤器中，检查是否为数字扩展名（.001-.999）
-        if ".001" in self.allowed_exts and file_ext.startswith(".") and len(file_ext) == 4:
-            # 检查是否为3位数字
-            if file_ext[1:].isdigit():
-                return True
+        end_index = len(posts)
+        if self.end_post_id:
+            for i in range(start_index, len(posts)):
+                if str(posts[i].get("post_info", {}).get('post_id', '')) == self.end_post_id:
+                    end_index = i + 1
+                    break
         
-        return False
-
-    def _should_update_ui(self, downloaded_files_count, matched_posts_count):
-        """判断是否应该更新UI"""
-        current_time = time.time() * 1000  # 转换为毫秒
+        return posts[start_index:end_index]
+    
+    def _fetch_post_detail(self, post_info: dict):
+        """获取帖子详细数据（用于标签过滤），失败返回None"""
+        post_id = post_info.get('post_id')
+        creator_id = post_info.get('creator_id')
+        service = self._service
         
-        # 检查是否达到批量大小
-        files_diff = downloaded_files_count - self.last_downloaded_count
+        if not all([post_id, creator_id, service]):
+            return None  # 缺少必要信息
         
-        # 达到批量大小或超过时间间隔时更新
-        if (files_diff >= self.ui_update_batch_size or 
-            current_time - self.last_ui_update >= self.ui_update_interval):
-            self.last_ui_update = current_time
-            self.last_downloaded_count = downloaded_files_count
-            self.last_processed_count = matched_posts_count
-            return True
-        return False
+        if self.pause_event.is_set():
+            return None
+        
+        try:
+            # 经由 get_post_detail 请求，近期确认不存在的帖子直接跳过
+            return get_post_detail(service, creator_id, post_id, self._domain_config,
+                                   cache_manager=self._cache_manager, headers=self._detail_headers)
+        except Exception:
+            return None  # 请求异常
+
+    def _iter_post_details(self, posts: list):
+        """按帖子顺序产出详细数据，同时最多预取 DETAIL_PREFETCH_WINDOW 个
+        
+        每取走一个结果再提交下一个请求，下载端处理较慢时不会积压整个作者的详情数据
+        """
+        submit = self._detail_executor.submit
+        fetch = self._fetch_post_detail
+        post_infos = (post_data.get("post_info", {}) for post_data in posts)
+        window = collections.deque(
+            submit(fetch, post_info) for post_info in itertools.islice(post_infos, DETAIL_PREFETCH_WINDOW)
+        )
+        while window:
+            future = window.popleft()
+            post_info = next(post_infos, None)
+            if post_info is not None:
+                window.append(submit(fetch, post_info))
+            yield future.result()
     
-    def _create_progress_callback(self, url: str, is_large_file: bool):
-        """创建进度回调函数"""
-        last_emit_time = [0]  # 使用列表来存储可变值
-        min_emit_interval = 0.1  # 最小发射间隔（秒）
+    def _create_progress_callback(self, url: str, large_state: dict):
+        """创建进度回调函数
+        
+        下载线程中只记录进度，信号由 _flush_progress 定时统一发送
+        
+        Args:
+            url: 文件URL
+            large_state: 下载任务的大文件状态，响应头到达后才能确定 {'large': bool}
+        """
+        # 回调在每次进度上报时调用，预先绑定为局部变量，避免重复属性查找
+        set_progress = self.all_files_progress.set
+        large_lock = self.current_large_file_lock
         
         def callback(downloaded, total):
             # 记录所有文件的进度
-            with self.all_files_progress_lock:
-                self.all_files_progress[url] = (downloaded, total)
-            
-            # 限制信号发射频率，避免栈溢出
-            current_time = time.time()
-            if current_time - last_emit_time[0] < min_emit_interval:
-                return  # 跳过太频繁的更新
+            set_progress(url, downloaded, total)
             
-            last_emit_time[0] = current_time
-            
-            # 如果是大文件，单独记录并发送信号
-            if is_large_file:
-                with self.current_large_file_lock:
+            # 大文件单独记录，界面优先显示大文件进度
+            if large_state['large']:
+                with large_lock:
                     self.current_large_file_progress = (downloaded, total)
-                # 发送大文件进度信号
-                self.file_progress.emit(downloaded, total, self.retry_count)
-            else:
-                # 小文件：如果没有大文件在下载，发送所有文件的综合进度
-                with self.current_large_file_lock:
-                    has_large_file = self.current_large_file_progress is not None
-                
-                if not has_large_file:
-                    # 计算所有小文件的总进度
-                    with self.all_files_progress_lock:
-                        total_downloaded = sum(d for d, t in self.all_files_progress.values())
-                        total_size = sum(t for d, t in self.all_files_progress.values())
-                    
-                    if total_size > 0:
-                        self.file_progress.emit(total_downloaded, total_size, self.retry_count)
         return callback
     
+    def _discard_files_state(self, urls: list):
+        """一批文件结束后移除其进度和重试状态"""
+        pop_progress = self.all_files_progress.pop
+        for url in urls:
+            pop_progress(url)
+        
+        with self.retrying_files_lock:
+            self.retrying_files.difference_update(urls)
+            self.retry_count = len(self.retrying_files)
+    
+    def _flush_progress(self):
+        """定时器回调（主线程）：读取一次进度快照并发送进度信号"""
+        with self.current_large_file_lock:
+            progress = self.current_large_file_progress
+        
+        if progress is None:
+            # 没有大文件在下载时，发送所有小文件的综合进度
+            progress = self.all_files_progress.totals()
+        
+        downloaded, total = progress
+        if total <= 0:
+            return
+        
+        state = (downloaded, total, self.retry_count)
+        if state != self._last_progress_state:
+            self._last_progress_state = state
+            self.file_progress.emit(*state)
+    
+    def _flush_stats(self):
+        """定时器回调（主线程）：统计数据有变化时发送统计信号"""
+        stats = self._stats
+        if stats != self._last_emitted_stats:
+            self._last_emitted_stats = stats
+            self.stats_update.emit(*stats)
+    
+    def _download_task(self, url: str, full_path: str, file_name: str):
+        """在下载线程中执行单个文件下载
+        
+        根据首个响应的 Content-Length 判断是否为大文件（无需额外的 HEAD 请求），
+        大文件需先获得名额，保证同一时间只有一个大文件在下载。
+        """
+        large_state = {'large': False}
+        
+        return self.large_file_gate.download(
+            url,
+            full_path,
+            COMMON_HEADERS,
+            cancel_event=self.pause_event,
+            state=large_state,
+            on_release=self._clear_large_file_progress,
+            progress_callback=self._create_progress_callback(url, large_state),
+            retry_callback=self._create_retry_callback(url)
+        )
+    
+    def _clear_large_file_progress(self):
+        """大文件结束时清理其进度（在释放名额前调用，下一个大文件尚未开始）"""
+        with self.current_large_file_lock:
+            self.current_large_file_progress = None
+
     def _create_retry_callback(self, url: str):
         """创建重试回调函数"""
         def callback(attempt, is_retrying):
@@ -282,73 +493,136 @@ class TagFilterDownloadCoordinator(QThread):
             if not self.allowed_exts:
                 return
             
-            # 早期检查：预先扫描是否有任何符合扩展名条件的文件
-            has_eligible_files = False
-            for post_data in self.detected_files_data:
-                files_in_post = post_data.get("files", [])
-                for file_info in files_in_post:
-                    file_ext = os.path.splitext(file_info.get("name", ""))[1].lower()
-                    if self.is_ext_match(file_ext):
-                        has_eligible_files = True
-                        break
-                if has_eligible_files:
-                    break
+            # 早期检查：是否有任何符合扩展名条件的文件
+            splitext = os.path.splitext
+            is_ext_match = self.is_ext_match
+            ext_search = self._ext_re.search if self._ext_re is not None else None
+            ext_search_all = self._ext_re_lines.search if self._ext_re_lines is not None else None
+            if self.detected_extensions is not None:
+                # 只需检查检测阶段收集到的不同扩展名，无需遍历所有文件
+                has_eligible_files = any(map(is_ext_match, self.detected_extensions))
+            elif ext_search is not None:
+                # 每个帖子的文件名拼接后只做一次正则搜索
+                has_eligible_files = any(
+                    ext_search_all("\n".join(file_info.get("name", "") for file_info in post_data.get("files", ())))
+                    for post_data in self.detected_files_data
+                )
+            else:
+                has_eligible_files = False
             
             # 如果没有符合扩展名条件的文件，直接结束
             if not has_eligible_files:
                 return
             
-            # Create download executor with optimized settings
-            max_workers = min(self.download_settings['threads'], 10)  # 限制最大线程数
-            executor = concurrent.futures.ThreadPoolExecutor(
-                max_workers=max_workers,
-                thread_name_prefix="download"
-            )
-            download_futures = {}
-            active_downloads = 0  # 跟踪活跃下载数
+            max_workers = max(1, min(self.download_settings['threads'], MAX_DOWNLOAD_THREADS))
+            # 下载执行器在提交第一个任务时才创建，没有匹配文件时无需调整连接池和创建线程池
+            executor = None
+            pending_downloads = 0  # 已提交但尚未处理完成的任务数
             
             total_posts = len(self.detected_files_data)
             processed_posts = 0
             matched_posts_count = 0  # 用于早期终止的计数器
             downloaded_files_count = 0  # 已下载文件计数
             failed_files_count = 0  # 失败文件计数
-            failed_files_list = []  # 失败文件列表 [(file_name, url, error)]
+            # 失败文件列表 [(file_name, url, error)]，摘要最多显示20个，只保留最近的20个
+            failed_files_list = collections.deque(maxlen=MAX_REPORTED_FAILURES)
             
-            # 跟踪每个帖子的下载情况（简单计数）
-            post_download_tracker = {}  # {post_key: {"total": 10, "completed": 5, "post_info": {...}}}
-            url_to_post_key = {}  # URL -> post_key 映射，用于在下载完成时找到对应的帖子
+            # 任务完成时由回调放入队列，协调线程按完成顺序处理结果，无需轮询扫描所有任务
+            completed_queue = queue.SimpleQueue()
+            # 限制已提交但未完成的任务数，避免内存占用过高
+            submit_slots = threading.BoundedSemaphore(max_workers * 3)
             
-            # 帖子ID范围过滤
-            started = not self.start_post_id  # 如果没有起始ID，则从一开始就启用
+            def on_future_done(future):
+                """下载线程中调用：通知协调线程并归还提交名额"""
+                completed_queue.put(future)
+                submit_slots.release()
             
-            for post_data in self.detected_files_data:
+            def handle_completed(future, url):
+                """处理一个已完成的下载任务的结果（在协调线程中执行）"""
+                nonlocal downloaded_files_count, failed_files_count
+                try:
+                    path, file_hash = future.result()
+                except (InterruptedError, concurrent.futures.CancelledError):
+                    return  # 下载已暂停（不计入失败）
+                except Exception as exc:
+                    failed_files_count += 1
+                    failed_files_list.append((url.rpartition('/')[2], url, str(exc)))
+                    return
+                
+                if not path:
+                    failed_files_count += 1
+                    failed_files_list.append((url.rpartition('/')[2], url, "Download returned None"))
+                    return
+                
+                downloaded_files_count += 1
+                # 只更新共享的统计数据，信号由定时器发送
+                self._stats = (downloaded_files_count, matched_posts_count)
+            
+            def drain_completed(first=None):
+                """处理队列中所有已完成的任务，返回处理数量
+                
+                按批取出，文件状态的清理每批只加一次锁
+                """
+                nonlocal pending_downloads
+                handled = 0
+                batch = [] if first is None else [first]
+                while True:
+                    while len(batch) < COMPLETION_BATCH_SIZE:
+                        try:
+                            batch.append(completed_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    if not batch:
+                        return handled
+                    
+                    urls = [future.file_url for future in batch]
+                    self._discard_files_state(urls)
+                    for future, url in zip(batch, urls):
+                        handle_completed(future, url)
+                    handled += len(batch)
+                    pending_downloads -= len(batch)
+                    # 处理完即丢弃 future 引用，已完成任务不会在内存中累积
+                    batch = []
+            
+            # 帖子ID范围过滤：预先截取起止ID之间的帖子
+            posts_to_process = self._select_posts_in_range()
+            
+            # 循环内不变的过滤条件提前计算，避免每个帖子重复读取属性
+            selected_tags = self.selected_tags
+            tag_filtering = bool(self.tag_filter_enabled and selected_tags)
+            if tag_filtering:
+                tags_preview = "、".join(list(selected_tags)[:3])
+                if len(selected_tags) > 3:
+                    tags_preview += "..."
+            
+            # 启用标签过滤时，在有限窗口内并发预取帖子详细数据，按帖子顺序返回结果
+            if tag_filtering:
+                self._detail_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=DETAIL_FETCH_WORKERS,
+                    thread_name_prefix="post-detail"
+                )
+                post_details_iter = self._iter_post_details(posts_to_process)
+            else:
+                post_details_iter = itertools.repeat(None)
+            
+            post_error_reported = False
+            for post_data, detailed_post_data in zip(posts_to_process, post_details_iter):
                 if self.pause_event.is_set():
                     # Gracefully shutdown executor
-                    executor.shutdown(wait=False, cancel_futures=True)
+                    if executor is not None:
+                        executor.shutdown(wait=False, cancel_futures=True)
                     return
                     
                 try:
                     post_info = post_data.get("post_info", {})
-                    post_id = str(post_info.get('post_id', ''))
-                    
-                    # 检查是否到达起始帖子ID
-                    if not started:
-                        if post_id == self.start_post_id:
-                            started = True
-                            # 找到起始ID，继续处理这个帖子（不跳过）
-                        else:
-                            continue  # 跳过起始ID之前的帖子
                     
                     processed_posts += 1
                     files_in_post = post_data.get("files", [])
                     
                     # 进度输出（简化：只在关键节点显示）
                     if processed_posts == 1 or processed_posts % 50 == 0:
-                        if self.tag_filter_enabled and self.selected_tags:
+                        if tag_filtering:
                             # 标签过滤：只显示已处理数量，不显示总数
-                            tags_preview = "、".join(list(self.selected_tags)[:3])
-                            if len(self.selected_tags) > 3:
-                                tags_preview += "..."
                             print(f"📊 处理: {processed_posts} 帖子 (标签: {tags_preview})")
                         else:
                             # 未启用标签过滤：显示所有帖子总数
@@ -356,45 +630,17 @@ class TagFilterDownloadCoordinator(QThread):
                     
                     # === 标签过滤检查 ===
                     # If tag filtering is enabled, we need to get detailed post data to check tags
-                    if self.tag_filter_enabled and self.selected_tags:
-                        # Get detailed post data via post API
-                        post_id = post_info.get('post_id')
-                        creator_id = post_info.get('creator_id')
-                        service = post_info.get('service', '').lower()
-                        
-                        if not all([post_id, creator_id, service]):
-                            continue  # 跳过帖子：缺少必要信息
-                        
-                        # Construct post API URL
-                        # We need domain config, let's determine it from service
-                        if service == 'patreon':
-                            domain_config = {'api_base': 'https://kemono.cr/api/v1', 'referer': 'https://kemono.cr/', 'base_url': 'https://kemono.cr'}
-                        else:
-                            domain_config = {'api_base': 'https://coomer.st/api/v1', 'referer': 'https://coomer.st/', 'base_url': 'https://coomer.st'}
-                        
-                        post_api_url = f"{domain_config['api_base']}/{service}/user/{creator_id}/post/{post_id}"
-                        
-                        # Get detailed post data
-                        headers = COMMON_HEADERS.copy()
-                        headers["Referer"] = domain_config['referer']
-                        
-                        try:
-                            response = make_robust_request(post_api_url, headers, max_retries=2, timeout=15)
-                            if not response:
-                                continue  # 跳过帖子（API请求失败）
-                            
-                            detailed_post_data = parse_json_response(response)
-                            if not detailed_post_data:
-                                continue  # 跳过帖子（数据解析失败）
-                        except Exception as api_error:
-                            continue  # 跳过帖子（请求异常）
+                    if tag_filtering:
+                        # 详细数据已在后台并发获取，失败时跳过帖子
+                        if not detailed_post_data:
+                            continue
                         
                         # Extract tags from detailed post data
                         actual_post_content = detailed_post_data.get('post', detailed_post_data)
-                        post_tags = set(actual_post_content.get('tags', []) or [])
+                        post_tags = actual_post_content.get('tags', []) or ()
                         
                         # Apply tag filtering (包含模式：帖子必须包含所有选中的标签)
-                        post_matches_filter = self.selected_tags.issubset(post_tags)
+                        post_matches_filter = selected_tags.issubset(post_tags)
                         
                         # Skip post if it doesn't match filter
                         if not post_matches_filter:
@@ -403,18 +649,20 @@ class TagFilterDownloadCoordinator(QThread):
                         # Re-detect files from detailed post data to ensure we have complete file info
                         post_details, updated_files = detect_files_from_post(
                             detailed_post_data,
-                            domain_config['base_url'].replace('https://', ''),
+                            self._service_domain,
                             self.allowed_exts,
                             {"file", "attachments", "content"}
                         )
                         files_in_post = updated_files
                 
                     # Count eligible files in this post
-                    eligible_files_count = 0
-                    for file_info in files_in_post:
-                        file_ext = os.path.splitext(file_info.get("name", ""))[1].lower()
-                        if self.is_ext_match(file_ext):
-                            eligible_files_count += 1
+                    if ext_search is not None:
+                        eligible_files_count = sum(
+                            1 for file_info in files_in_post
+                            if ext_search(file_info.get("name", ""))
+                        )
+                    else:
+                        eligible_files_count = 0
                     
                     # Only log and process if post has eligible files
                     if eligible_files_count > 0:
@@ -424,25 +672,26 @@ class TagFilterDownloadCoordinator(QThread):
                         # Skip if no eligible files
                         continue
                 
-                    # 初始化帖子下载跟踪
-                    service = post_info.get('service', '').lower()
-                    creator_id_str = str(post_info.get('creator_id', ''))
-                    post_id_str = str(post_info.get('post_id', ''))
-                    post_key = f"{service}:{creator_id_str}:{post_id_str}"
-                    
-                    if post_key and post_key not in post_download_tracker:
-                        post_download_tracker[post_key] = {
-                            "total": eligible_files_count,
-                            "completed": 0,
-                            "post_info": post_info
-                        }
+                    # 作者和帖子文件夹只依赖帖子信息，每个帖子计算一次
+                    creator_folder_name = format_name_from_template(
+                        self.download_settings["creator_folder_name_template"], post_info
+                    )
+                    post_folder_name = format_name_from_template(
+                        self.download_settings["post_folder_name_template"], post_info
+                    )
+                    post_dir = os.path.join(
+                        self.download_settings["download_root"],
+                        creator_folder_name,
+                        post_folder_name
+                    )
                     
                     # Process files in this post
                     for file_info in files_in_post:
                         # 在处理每个文件前检查暂停信号
                         if self.pause_event.is_set():
                             print(f"⏸️ 检测到暂停信号，停止提交新任务...")
-                            executor.shutdown(wait=False, cancel_futures=True)
+                            if executor is not None:
+                                executor.shutdown(wait=False, cancel_futures=True)
                             return
                         
                         file_name_with_ext = file_info.get("name", "")
@@ -451,18 +700,18 @@ class TagFilterDownloadCoordinator(QThread):
                         if not file_name_with_ext:
                             continue
                         
-                        file_name_original, file_ext_with_dot = os.path.splitext(file_name_with_ext)
+                        file_name_original, file_ext_with_dot = splitext(file_name_with_ext)
                         
                         # 如果分离后没有扩展名，尝试从URL中获取
                         if not file_ext_with_dot:
                             url = file_info.get("url", "")
-                            _, url_ext = os.path.splitext(url.split('?')[0])  # 移除URL参数
+                            _, url_ext = splitext(url.split('?')[0])  # 移除URL参数
                             if url_ext:
                                 file_ext_with_dot = url_ext.lower()
                                 file_name_with_ext = file_name_original + file_ext_with_dot
                         
                         # Check if file extension is allowed
-                        if not self.is_ext_match(file_ext_with_dot.lower()):
+                        if not is_ext_match(file_ext_with_dot.lower()):
                             continue
                         
                         # 最后确保扩展名存在（安全检查）
@@ -470,13 +719,6 @@ class TagFilterDownloadCoordinator(QThread):
                             continue
                         
                         # Construct file path
-                        creator_folder_name = format_name_from_template(
-                            self.download_settings["creator_folder_name_template"], post_info
-                        )
-                        post_folder_name = format_name_from_template(
-                            self.download_settings["post_folder_name_template"], post_info
-                        )
-                        
                         file_name_data = {
                             **post_info, 
                             "file_name_original": file_name_original, 
@@ -487,215 +729,53 @@ class TagFilterDownloadCoordinator(QThread):
                             self.download_settings["file_name_template"], file_name_data
                         )
                         
-                        full_path = os.path.join(
-                            self.download_settings["download_root"], 
-                            creator_folder_name, 
-                            post_folder_name, 
-                            final_file_name
-                        )
+                        full_path = os.path.join(post_dir, final_file_name)
                         
-                        # 及时清理已完成的任务，避免队列堆积
-                        completed_futures = []
-                        for future in list(download_futures.keys()):
-                            if future.done():
-                                completed_futures.append(future)
-                        
-                        # 处理所有已完成的任务（静默清理）
-                        if len(completed_futures) > 0:
-                            pass  # 静默清理已完成的任务
-                        
-                        for completed_future in completed_futures:
-                            url = download_futures[completed_future]
-                            del download_futures[completed_future]
-                            
-                            # 清理该文件的进度记录
-                            with self.all_files_progress_lock:
-                                self.all_files_progress.pop(url, None)
-                            
-                            # 如果是大文件，清理大文件进度
-                            if completed_future == self.large_file_future:
-                                with self.current_large_file_lock:
-                                    self.current_large_file_progress = None
-                                self.large_file_future = None
-                            
-                            try:
-                                path, file_hash = completed_future.result()
-                                if path:
-                                    downloaded_files_count += 1
-                                    if self._should_update_ui(downloaded_files_count, matched_posts_count):
-                                        self.stats_update.emit(downloaded_files_count, matched_posts_count)
-                                    
-                                    # 更新帖子下载计数
-                                    p_key = url_to_post_key.get(url)
-                                    if p_key and p_key in post_download_tracker:
-                                        post_download_tracker[p_key]["completed"] += 1
-                                        tracker = post_download_tracker[p_key]
-                                        
-                                        # 如果帖子所有文件都下载完成，显示提示
-                                        if tracker["completed"] >= tracker["total"]:
-                                            p_info = tracker["post_info"]
-                                            print(f"✅ 帖子已完成: {p_info.get('post_title', 'Untitled')} ({tracker['completed']}/{tracker['total']})")
-                                else:
-                                    failed_files_count += 1
-                            except Exception as e:
-                                failed_files_count += 1
-                                file_name = os.path.basename(url)
-                                failed_files_list.append((file_name, url, str(e)))
-                        
-                        # 如果队列太满，等待任务完成（避免内存占用过高）
-                        wait_attempts = 0
-                        max_wait_attempts = 10  # 最多等待10次
-                        while len(download_futures) >= max_workers * 3:
-                            if wait_attempts >= max_wait_attempts:
-                                # 队列过满但等待超时，强制继续添加任务
+                        # 及时处理已完成的任务；提交名额用尽时等待任务完成
+                        drain_completed()
+                        while not submit_slots.acquire(timeout=0.5):
+                            drain_completed()
+                            if self.pause_event.is_set():
                                 break
-                            
-                            try:
-                                # 检查是否有任务完成
-                                if not download_futures:
-                                    break
-                                
-                                completed_future = next(concurrent.futures.as_completed(download_futures.keys(), timeout=0.5))
-                                url = download_futures[completed_future]
-                                del download_futures[completed_future]
-                                
-                                # 清理该文件的进度记录
-                                with self.all_files_progress_lock:
-                                    self.all_files_progress.pop(url, None)
-                                
-                                # 如果是大文件，清理大文件进度
-                                if completed_future == self.large_file_future:
-                                    with self.current_large_file_lock:
-                                        self.current_large_file_progress = None
-                                    self.large_file_future = None
-                                
-                                try:
-                                    path, file_hash = completed_future.result()
-                                    if path:
-                                        downloaded_files_count += 1
-                                        if self._should_update_ui(downloaded_files_count, matched_posts_count):
-                                            self.stats_update.emit(downloaded_files_count, matched_posts_count)
-                                    else:
-                                        failed_files_count += 1
-                                except Exception as e:
-                                    failed_files_count += 1
-                                    file_name = os.path.basename(url)
-                                    failed_files_list.append((file_name, url, str(e)))
-                                
-                                break
-                            except concurrent.futures.TimeoutError:
-                                wait_attempts += 1
-                                # 超时后再次检查已完成的任务
-                                for future in list(download_futures.keys()):
-                                    if future.done():
-                                        url = download_futures[future]
-                                        del download_futures[future]
-                                        
-                                        # 清理该文件的进度记录
-                                        with self.all_files_progress_lock:
-                                            self.all_files_progress.pop(url, None)
-                                        
-                                        # 如果是大文件，清理大文件进度
-                                        if future == self.large_file_future:
-                                            with self.current_large_file_lock:
-                                                self.current_large_file_progress = None
-                                            self.large_file_future = None
-                                        
-                                        try:
-                                            path, file_hash = future.result()
-                                            if path:
-                                                downloaded_files_count += 1
-                                        except:
-                                            pass
-                                continue
                         
-                        # 检查文件大小以决定下载策略
-                        file_url = file_info["url"]
-                        file_size = get_file_size(file_url, COMMON_HEADERS, timeout=5)
-                        is_large_file = file_size > self.large_file_threshold
-                        
-                        # 如果是大文件（>50MB），等待之前的大文件下载完成
-                        if is_large_file:
-                            if self.large_file_future and not self.large_file_future.done():
-                                # 等待当前大文件下载完成
-                                prev_url = download_futures.get(self.large_file_future)
-                                try:
-                                    path, file_hash = self.large_file_future.result()
-                                    if path:
-                                        downloaded_files_count += 1
-                                        if self._should_update_ui(downloaded_files_count, matched_posts_count):
-                                            self.stats_update.emit(downloaded_files_count, matched_posts_count)
-                                        
-                                        # 更新帖子下载计数
-                                        if prev_url:
-                                            p_key = url_to_post_key.get(prev_url)
-                                            if p_key and p_key in post_download_tracker:
-                                                post_download_tracker[p_key]["completed"] += 1
-                                                tracker = post_download_tracker[p_key]
-                                                if tracker["completed"] >= tracker["total"]:
-                                                    p_info = tracker["post_info"]
-                                                    print(f"✅ 帖子已完成: {p_info.get('post_title', 'Untitled')} ({tracker['completed']}/{tracker['total']})")
-                                    else:
-                                        failed_files_count += 1
-                                except Exception as e:
-                                    failed_files_count += 1
-                                    if prev_url:
-                                        file_name = os.path.basename(prev_url)
-                                        failed_files_list.append((file_name, prev_url, str(e)))
-                                
-                                # 清理已完成的future和进度记录
-                                if self.large_file_future in download_futures:
-                                    del download_futures[self.large_file_future]
-                                if prev_url:
-                                    with self.all_files_progress_lock:
-                                        self.all_files_progress.pop(prev_url, None)
-                                # 清理大文件进度标记
-                                with self.current_large_file_lock:
-                                    self.current_large_file_progress = None
-                                self.large_file_future = None
-                            
-                            # 提交新的大文件下载任务
-                            file_size_mb = file_size / (1024 * 1024)
-                            print(f"📦 大文件检测: {final_file_name} ({file_size_mb:.1f}MB) - 使用串行下载")
+                        if self.pause_event.is_set():
+                            print(f"⏸️ 检测到暂停信号，停止提交新任务...")
+                            if executor is not None:
+                                executor.shutdown(wait=False, cancel_futures=True)
+                            return
                         
-                        # Submit download task（为所有文件创建进度回调和重试回调）
-                        progress_callback = self._create_progress_callback(file_url, is_large_file)
-                        retry_callback = self._create_retry_callback(file_url)
-                        future = executor.submit(
-                            download_file, 
-                            file_url, 
-                            full_path, 
-                            COMMON_HEADERS, 
-                            cancel_event=self.pause_event,
-                            progress_callback=progress_callback,
-                            retry_callback=retry_callback
-                        )
-                        download_futures[future] = file_url  # 恢复原始结构
-                        url_to_post_key[file_url] = post_key  # 建立URL到帖子的映射
-                        active_downloads += 1
+                        if executor is None:
+                            # 按并发数调整连接池大小，避免线程等待连接
+                            get_session(max_workers=max_workers)
+                            # 线程池内部使用单一共享任务队列，空闲线程会立即领取下一个文件
+                            executor = concurrent.futures.ThreadPoolExecutor(
+                                max_workers=max_workers,
+                                thread_name_prefix="download"
+                            )
                         
-                        # 如果是大文件，记录其future以便后续等待
-                        if is_large_file:
-                            self.large_file_future = future
-                    
-                    # 检查是否到达结束帖子ID
-                    if self.end_post_id and post_id == self.end_post_id:
-                        print(f"✅ 已到达结束帖子ID: {self.end_post_id}，停止下载")
-                        break
+                        # Submit download task（大文件判断和串行控制在下载线程中根据响应头完成）
+                        file_url = file_info["url"]
+                        future = executor.submit(self._download_task, file_url, full_path, final_file_name)
+                        future.file_url = file_url  # URL 直接附在任务上，无需额外映射
+                        pending_downloads += 1
+                        future.add_done_callback(on_future_done)
+                        future = None
                         
                 except Exception as post_error:
                     # 单个帖子处理失败不应该中断整个下载进程
                     post_title = post_info.get('post_title', 'Unknown') if 'post_info' in locals() else 'Unknown'
                     print(f"⚠️ 处理帖子 '{post_title}' 时出错: {post_error}")
-                    import traceback
-                    traceback.print_exc()
+                    # 只输出第一次出错的完整堆栈，批量失败（如断网）时不重复格式化
+                    if not post_error_reported:
+                        post_error_reported = True
+                        traceback.print_exc()
                     continue
             
             print(f"✓ 帖子检测完成，共处理 {processed_posts}/{total_posts} 个帖子，匹配 {matched_posts_count} 个")
             
             # Wait for all downloads to complete
             completed_count = 0
-            total_downloads = len(download_futures)
+            total_downloads = pending_downloads
             
             print(f"📥 等待任务完成...")
             
@@ -705,107 +785,25 @@ class TagFilterDownloadCoordinator(QThread):
                 return
             
             try:
-                # 先清理所有已完成的任务
-                # 检查已完成的任务
-                completed_futures = []
-                for future in list(download_futures.keys()):
-                    if future.done():
-                        completed_futures.append(future)
-                
-                # 处理已完成的任务
-                for completed_future in completed_futures:
-                    url = download_futures[completed_future]
-                    del download_futures[completed_future]
-                    completed_count += 1
-                    
-                    # 清理该文件的进度记录
-                    with self.all_files_progress_lock:
-                        self.all_files_progress.pop(url, None)
-                    
-                    # 清理该文件的重试状态
-                    with self.retrying_files_lock:
-                        self.retrying_files.discard(url)
-                        self.retry_count = len(self.retrying_files)
-                    
-                    # 如果是大文件，清理大文件进度
-                    if completed_future == self.large_file_future:
-                        with self.current_large_file_lock:
-                            self.current_large_file_progress = None
-                        self.large_file_future = None
+                # 按完成顺序处理剩余任务，超时仅用于检查暂停信号
+                while pending_downloads:
+                    if self.pause_event.is_set():
+                        print("⏸️  检测到暂停信号")
+                        break
                     
                     try:
-                        path, file_hash = completed_future.result()
-                        if path:
-                            downloaded_files_count += 1
-                        else:
-                            failed_files_count += 1
-                    except Exception as e:
-                        failed_files_count += 1
-                        file_name = os.path.basename(url)
-                        failed_files_list.append((file_name, url, str(e)))
-                
-                # 更新剩余任务数
-                remaining_tasks = len(download_futures)
-                # 等待剩余任务
-                
-                # 等待剩余的任务
-                if remaining_tasks > 0:
-                    pass  # 等待剩余任务
-                    processed_in_loop = 0
-                    for future in concurrent.futures.as_completed(download_futures, timeout=None):
-                        if self.pause_event.is_set():
-                            print("⏸️  检测到暂停信号")
-                            break  # 检测到暂停信号
-                            
-                        url = download_futures[future]
-                        completed_count += 1
-                        processed_in_loop += 1
-                        
-                        # 清理该文件的进度记录
-                        with self.all_files_progress_lock:
-                            self.all_files_progress.pop(url, None)
-                        
-                        # 清理该文件的重试状态
-                        with self.retrying_files_lock:
-                            self.retrying_files.discard(url)
-                            self.retry_count = len(self.retrying_files)
-                        
-                        # 如果是大文件，清理大文件进度
-                        if future == self.large_file_future:
-                            with self.current_large_file_lock:
-                                self.current_large_file_progress = None
-                            self.large_file_future = None
-                        
-                        # 显示进度（简化）
-                        if completed_count % 50 == 0 or completed_count == total_downloads:
-                            print(f"⏳ {completed_count}/{total_downloads}")
-                        
-                        try:
-                            path, file_hash = future.result()
-                            if path:  # 只要有路径就认为下载成功
-                                downloaded_files_count += 1
-                                # 只在满足条件时更新UI，减少信号发送频率
-                                if self._should_update_ui(downloaded_files_count, matched_posts_count):
-                                    self.stats_update.emit(downloaded_files_count, matched_posts_count)
-                            else:
-                                failed_files_count += 1
-                                file_name = os.path.basename(url)
-                                failed_files_list.append((file_name, url, "Download returned None"))
-                        except InterruptedError:
-                            print("⏸️  任务被中断")
-                            continue  # 下载已暂停（不计入失败）
-                        except Exception as exc:
-                            print(f"⚠️  任务异常: {exc}")
-                            failed_files_count += 1
-                            file_name = os.path.basename(url)
-                            failed_files_list.append((file_name, url, str(exc)))
-                        
-                        # 检查是否所有任务都已处理
-                        if processed_in_loop >= remaining_tasks:
-                            print(f"✓ 已处理所有 {remaining_tasks} 个剩余任务，退出循环")
-                            break
+                        future = completed_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    
+                    previous_count = completed_count
+                    completed_count += drain_completed(future)
+                    # 不在循环变量中保留最后一个任务（及其结果）的引用
+                    future = None
                     
-                    print(f"🏁 as_completed 循环结束（处理了 {processed_in_loop} 个任务）")
+                    # 显示进度（简化：每完成50个显示一次）
+                    if completed_count // 50 != previous_count // 50 or completed_count == total_downloads:
+                        print(f"⏳ {completed_count}/{total_downloads}")
                 
                 print(f"✓ 所有任务已完成: 成功 {downloaded_files_count}, 失败 {failed_files_count}")
                 
@@ -816,13 +814,15 @@ class TagFilterDownloadCoordinator(QThread):
                 else:
                     print("📊 发送最终统计...")
                     # 下载完成时发送最终的UI更新
+                    self._stats = (downloaded_files_count, matched_posts_count)
+                    self._last_emitted_stats = self._stats
                     self.stats_update.emit(downloaded_files_count, matched_posts_count)
                     
                     # 发送下载统计摘要
                     summary = {
                         'success': downloaded_files_count,
                         'failed': failed_files_count,
-                        'failed_files': failed_files_list[:20]  # 最多显示20个失败文件
+                        'failed_files': list(failed_files_list)
                     }
                     self.download_summary.emit(summary)
                     
@@ -839,5 +839,8 @@ class TagFilterDownloadCoordinator(QThread):
         except Exception as e:
             self.error.emit(f"标签过滤下载协调器发生错误: {e}")
         finally:
+            if self._detail_executor is not None:
+                self._detail_executor.shutdown(wait=False, cancel_futures=True)
+                self._detail_executor = None
             self.finished.emit()
 
@@ -7,10 +7,7 @@ from .layouts import BaseFlowLayout, FlowLayout, JustifyFlowLayout
 from .styles import (
     UNDERLINE_INPUT_STYLE, 
     MUTED_LABEL_STYLE, 
-    MAIN_STYLESHEET,
-    EXT_BUTTON_DISABLED_STYLE,
-    EXT_BUTTON_ENABLED_STYLE,
-    EXT_BUTTON_DISABLED_FILTER_STYLE
+    MAIN_STYLESHEET
 )
 
 __all__ = [
@@ -23,8 +20,5 @@ __all__ = [
     'UNDERLINE_INPUT_STYLE',
     'MUTED_LABEL_STYLE',
     'MAIN_STYLESHEET',
-    'EXT_BUTTON_DISABLED_STYLE',
-    'EXT_BUTTON_ENABLED_STYLE',
-    'EXT_BUTTON_DISABLED_FILTER_STYLE',
 ]
 
@@ -1,14 +1,78 @@
 """作者快捷按钮管理组件"""
 import os
 import json
-from PyQt6.QtWidgets import QPushButton, QWidget, QSizePolicy
-from PyQt6.QtCore import Qt, QEvent
+import threading
+from itertools import islice
+from types import MappingProxyType
+from PyQt6.QtWidgets import QPushButton, QWidget, QSizePolicy, QApplication
+from PyQt6.QtCore import Qt, QEvent, QTimer, QThread
+from PyQt6.QtGui import QFontMetrics
 
 from ...utils.i18n import _
 from ...utils.paths import APP_DATA_FILE
 from ..layouts import JustifyFlowLayout
 
 
+# 服务的显示名称，未列出的服务使用首字母大写形式
+_SERVICE_NAMES = MappingProxyType({
+    'patreon': 'Patreon',
+    'fanbox': 'Fanbox',
+    'fantia': 'Fantia',
+    'onlyfans': 'OnlyFans',
+    'fansly': 'Fansly',
+    'boosty': 'Boosty',
+    'gumroad': 'Gumroad',
+    'subscribestar': 'SubscribeStar'
+})
+
+
+class AppDataWriter(QThread):
+    """配置文件写入线程
+    
+    只保留最新一份待写入内容，连续提交时旧内容直接被覆盖，提交方不会阻塞。
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+    
+    def submit(self, text: str):
+        """提交待写入的配置内容（已序列化的JSON文本）"""
+        with self._lock:
+            self._pending = text
+        self._wakeup.set()
+    
+    def stop(self):
+        """写完剩余内容后结束线程"""
+        self._stopping = True
+        self._wakeup.set()
+    
+    def run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                text, self._pending = self._pending, None
+            if text is not None:
+                self._write(text)
+            if self._stopping and self._pending is None:
+                return
+    
+    @staticmethod
+    def _write(text: str):
+        """写入临时文件后替换配置文件，避免写入中断导致配置损坏"""
+        tmp_file = APP_DATA_FILE + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_file, APP_DATA_FILE)
+        except Exception as e:
+            print(f"❌ 保存配置文件失败: {e}")
+
+
 class CreatorButtonsMixin:
     """作者按钮管理功能混入类"""
     
@@ -16,8 +80,13 @@ class CreatorButtonsMixin:
         """初始化作者按钮相关变量"""
         self.creator_buttons = []
         self.max_creator_buttons = 8
-        self.pinned_creator_buttons = set()
-        self.pinned_creator_buttons_order = []
+        # 所有作者按钮字体相同，共用一个字体度量对象计算文字宽度
+        self._btn_fm = QFontMetrics(QApplication.font())
+        if not hasattr(self, '_app_data'):
+            self._app_data = self._load_app_data()
+        # 固定状态只整体替换不原地修改，刷新按钮时读取的始终是完整快照
+        self.pinned_creator_buttons = frozenset()
+        self.pinned_creator_buttons_order = ()
         self._load_pinned_creators()
     
     def setup_creator_buttons_ui(self, container: QWidget):
@@ -38,61 +107,69 @@ class CreatorButtonsMixin:
         current_url = self.url_input.text().strip()
         
         try:
-            if os.path.exists(APP_DATA_FILE):
-                with open(APP_DATA_FILE, "r", encoding='utf-8') as f:
-                    app_data = json.load(f)
-            else:
-                app_data = {"settings": self.settings, "creator_buttons": [], "version": "1.0.0"}
-            
-            creator_urls = app_data.get('creator_urls', [])
+            app_data = self._app_data
+            app_data.setdefault("settings", self.settings)
+            app_data.setdefault("version", "1.0.0")
             
-            if current_url in creator_urls:
-                creator_urls.remove(current_url)
+            # 以字典保持顺序并去重，移动到最前面无需线性查找和删除
+            creator_urls = {current_url: None}
+            creator_urls.update(dict.fromkeys(app_data.get('creator_urls', ())))
             
-            creator_urls.insert(0, current_url)
-            creator_urls = creator_urls[:self.max_creator_buttons]
-            
-            app_data['creator_urls'] = creator_urls
+            app_data['creator_urls'] = list(islice(creator_urls, self.max_creator_buttons))
             app_data['creator_info'] = app_data.get('creator_info', {})
             app_data['creator_info'][current_url] = creator_info
             
-            with open(APP_DATA_FILE, "w", encoding='utf-8') as f:
-                json.dump(app_data, f, ensure_ascii=False, indent=4)
-            
+            self._persist_app_data()
             self._refresh_creator_buttons()
             
         except Exception as e:
             print(f"❌ 保存作者URL失败: {e}")
     
     def _refresh_creator_buttons(self):
-        """从配置文件重新加载并显示作者按钮"""
+        """根据配置重新排列作者按钮，URL 未变化的按钮直接复用"""
         try:
+            # 按URL收集现有按钮，同一URL可能对应多个按钮
+            old_buttons = {}
             for button in self.creator_buttons:
-                button.setParent(None)
-                button.deleteLater()
-            self.creator_buttons.clear()
+                old_buttons.setdefault(button.creator_url, []).append(button)
+            self.creator_buttons = []
             
-            for i in reversed(range(self.creator_buttons_layout.count())):
-                item = self.creator_buttons_layout.takeAt(i)
-                if item and item.widget():
-                    item.widget().setParent(None)
+            # 先从布局中取出所有按钮，按新顺序重新加入
+            layout = self.creator_buttons_layout
+            while layout.count():
+                layout.takeAt(layout.count() - 1)
             
-            if os.path.exists(APP_DATA_FILE):
-                with open(APP_DATA_FILE, "r", encoding='utf-8') as f:
-                    app_data = json.load(f)
+            if self._app_data:
+                app_data = self._app_data
                 
                 creator_urls = app_data.get('creator_urls', [])
                 creator_info_dict = app_data.get('creator_info', {})
                 
-                pinned_urls = [url for url in self.pinned_creator_buttons_order if url in creator_urls]
-                unpinned_urls = [url for url in creator_urls if url not in self.pinned_creator_buttons]
+                pinned = self.pinned_creator_buttons
+                known_urls = set(creator_urls)
+                pinned_urls = [url for url in self.pinned_creator_buttons_order if url in known_urls]
+                unpinned_urls = [url for url in creator_urls if url not in pinned]
                 
                 for url in pinned_urls + unpinned_urls:
                     if url in creator_info_dict:
                         creator_info = creator_info_dict[url]
-                        creator_key = f"{creator_info.get('service', '')}_{creator_info.get('id', '')}"
-                        self._create_creator_button(creator_info, creator_key)
-                
+                        reusable = old_buttons.get(creator_info.get('url', ''))
+                        if reusable:
+                            button = reusable.pop()
+                            self._update_creator_button(button, creator_info)
+                            self.creator_buttons.append(button)
+                            layout.addWidget(button)
+                        else:
+                            creator_key = f"{creator_info.get('service', '')}_{creator_info.get('id', '')}"
+                            self._create_creator_button(creator_info, creator_key)
+            
+            # 删除不再需要的按钮
+            for buttons in old_buttons.values():
+                for button in buttons:
+                    button.setParent(None)
+                    button.deleteLater()
+            
+            if self._app_data:
                 if self.creator_buttons:
                     self.creator_buttons_container.setVisible(True)
                     self.creator_info_label.setVisible(True)
@@ -105,35 +182,16 @@ class CreatorButtonsMixin:
     
     def _create_creator_button(self, creator_info: dict, creator_key: str, insert_at_front: bool = False):
         """创建单个作者快捷按钮"""
-        service = creator_info.get('service', '').lower()
-        name = creator_info.get('name', '')
-        post_count = creator_info.get('post_count', 0)
-        updated = creator_info.get('updated', '')
         creator_url = creator_info.get('url', '')
         
         button = QPushButton()
-        is_pinned = creator_url in self.pinned_creator_buttons
-        button.setObjectName("creatorButtonPinned" if is_pinned else "creatorButton")
         button.creator_url = creator_url
         
-        display_text = f"⭐ {name}" if is_pinned else name
-        button.setText(display_text)
-        
         button.setMinimumHeight(30)
         button.setMaximumHeight(35)
-        
-        font_metrics = button.fontMetrics()
-        text_width = font_metrics.boundingRect(display_text).width()
-        if hasattr(font_metrics, 'horizontalAdvance'):
-            text_width = font_metrics.horizontalAdvance(display_text)
-        button_width = text_width + 24
-        button.setMinimumWidth(button_width)
-        
         button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         
-        button._creator_service = self._get_service_display_name(service)
-        button._creator_post_count = post_count
-        button._creator_updated = updated
+        self._update_creator_button(button, creator_info)
         
         button.installEventFilter(self)
         button.clicked.connect(lambda: self._on_creator_button_clicked(creator_url))
@@ -148,19 +206,32 @@ class CreatorButtonsMixin:
         self.creator_buttons_layout.addWidget(button)
         return button
     
+    def _update_creator_button(self, button: QPushButton, creator_info: dict):
+        """按作者信息和固定状态设置按钮的文字、样式和悬停信息"""
+        service = creator_info.get('service', '').lower()
+        name = creator_info.get('name', '')
+        
+        is_pinned = button.creator_url in self.pinned_creator_buttons
+        object_name = "creatorButtonPinned" if is_pinned else "creatorButton"
+        if button.objectName() != object_name:
+            button.setObjectName(object_name)
+            # 对象名变化后重新应用样式表
+            button.style().unpolish(button)
+            button.style().polish(button)
+        
+        display_text = f"⭐ {name}" if is_pinned else name
+        if button.text() != display_text:
+            button.setText(display_text)
+            text_width = self._btn_fm.horizontalAdvance(display_text)
+            button.setMinimumWidth(text_width + 24)
+        
+        button._creator_service = self._get_service_display_name(service)
+        button._creator_post_count = creator_info.get('post_count', 0)
+        button._creator_updated = creator_info.get('updated', '')
+    
     def _get_service_display_name(self, service: str) -> str:
         """获取服务的显示名称"""
-        service_names = {
-            'patreon': 'Patreon',
-            'fanbox': 'Fanbox',
-            'fantia': 'Fantia',
-            'onlyfans': 'OnlyFans',
-            'fansly': 'Fansly',
-            'boosty': 'Boosty',
-            'gumroad': 'Gumroad',
-            'subscribestar': 'SubscribeStar'
-        }
-        return service_names.get(service.lower(), service.title())
+        return _SERVICE_NAMES.get(service.lower()) or service.title()
     
     def _on_creator_button_clicked(self, creator_url: str):
         """处理作者按钮点击事件"""
@@ -173,9 +244,9 @@ class CreatorButtonsMixin:
             return
         
         if creator_url in self.pinned_creator_buttons:
-            self.pinned_creator_buttons.remove(creator_url)
+            self.pinned_creator_buttons = self.pinned_creator_buttons - {creator_url}
         else:
-            self.pinned_creator_buttons.add(creator_url)
+            self.pinned_creator_buttons = self.pinned_creator_buttons | {creator_url}
         
         self._save_pinned_creators()
         self._refresh_creator_buttons()
@@ -183,21 +254,16 @@ class CreatorButtonsMixin:
     def _save_pinned_creators(self):
         """保存固定的作者按钮状态到配置文件"""
         try:
-            try:
-                with open(APP_DATA_FILE, 'r', encoding='utf-8') as f:
-                    app_data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                app_data = {}
+            app_data = self._app_data
             
             old_pinned = app_data.get('pinned_creators', [])
             new_pinned = [url for url in self.pinned_creator_buttons if url not in old_pinned]
             updated_pinned = new_pinned + [url for url in old_pinned if url in self.pinned_creator_buttons]
             
-            self.pinned_creator_buttons_order = updated_pinned
+            self.pinned_creator_buttons_order = tuple(updated_pinned)
             app_data['pinned_creators'] = updated_pinned
             
-            with open(APP_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(app_data, f, ensure_ascii=False, indent=2)
+            self._persist_app_data()
             
         except Exception as e:
             pass  # 静默处理错误
@@ -205,20 +271,70 @@ class CreatorButtonsMixin:
     def _load_pinned_creators(self):
         """从配置文件加载固定的作者按钮状态"""
         try:
-            with open(APP_DATA_FILE, 'r', encoding='utf-8') as f:
-                app_data = json.load(f)
-                
-            pinned_list = app_data.get('pinned_creators', [])
-            self.pinned_creator_buttons_order = pinned_list
-            self.pinned_creator_buttons = set(pinned_list)
+            pinned_list = self._app_data.get('pinned_creators', [])
+            self.pinned_creator_buttons_order = tuple(pinned_list)
+            self.pinned_creator_buttons = frozenset(pinned_list)
             
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            self.pinned_creator_buttons_order = []
-            self.pinned_creator_buttons = set()
         except Exception as e:
             print(f"❌ 加载固定状态失败: {e}")
-            self.pinned_creator_buttons_order = []
-            self.pinned_creator_buttons = set()
+            self.pinned_creator_buttons_order = ()
+            self.pinned_creator_buttons = frozenset()
+    
+    def _load_app_data(self) -> dict:
+        """读取配置文件，之后的读写都基于内存中的副本"""
+        try:
+            with open(APP_DATA_FILE, 'r', encoding='utf-8') as f:
+                app_data = json.load(f)
+            if isinstance(app_data, dict):
+                return app_data
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        except Exception as e:
+            print(f"❌ 读取配置文件失败: {e}")
+        return {}
+    
+    def _persist_app_data(self, immediate: bool = False):
+        """保存内存中的配置，默认延迟500ms写入以合并连续的修改"""
+        timer = getattr(self, '_app_data_save_timer', None)
+        if immediate:
+            if timer is not None:
+                timer.stop()
+            self._write_app_data()
+            return
+        
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(500)
+            timer.timeout.connect(self._write_app_data)
+            self._app_data_save_timer = timer
+        timer.start()
+    
+    def _flush_app_data(self):
+        """写入尚未保存的配置并等待写入线程结束（关闭窗口时调用）"""
+        timer = getattr(self, '_app_data_save_timer', None)
+        if timer is not None and timer.isActive():
+            self._persist_app_data(immediate=True)
+        
+        writer = getattr(self, '_app_data_writer', None)
+        if writer is not None:
+            writer.stop()
+            writer.wait(2000)
+    
+    def _write_app_data(self):
+        """序列化当前配置并交给写入线程，磁盘写入不阻塞界面"""
+        try:
+            text = json.dumps(self._app_data, ensure_ascii=False, indent=4)
+        except Exception as e:
+            print(f"❌ 保存配置文件失败: {e}")
+            return
+        
+        writer = getattr(self, '_app_data_writer', None)
+        if writer is None:
+            writer = AppDataWriter(self)
+            self._app_data_writer = writer
+            writer.start()
+        writer.submit(text)
     
     def _show_creator_info(self, button):
         """显示作者详细信息"""
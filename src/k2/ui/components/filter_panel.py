@@ -2,19 +2,20 @@
 import os
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
-    QWidget, QSizePolicy, QTreeWidgetItemIterator
+    QWidget, QSizePolicy, QApplication
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSlot
+from PyQt6.QtGui import QFontMetrics
 
 from ...utils.i18n import _
-from ..styles import (
-    UNDERLINE_INPUT_STYLE, MUTED_LABEL_STYLE,
-    EXT_BUTTON_DISABLED_STYLE, EXT_BUTTON_ENABLED_STYLE,
-    EXT_BUTTON_DISABLED_FILTER_STYLE
-)
+from ..styles import UNDERLINE_INPUT_STYLE, MUTED_LABEL_STYLE
 from ..layouts import FlowLayout
 
 
+# 搜索框停止输入后再刷新标签按钮的延迟（毫秒）
+TAG_SEARCH_DELAY_MS = 200
+
+
 class FilterPanelMixin:
     """过滤面板功能混入类"""
     
@@ -25,6 +26,32 @@ class FilterPanelMixin:
         self.creator_tags_with_counts = None
         self.filter_options = {}
         self.detected_extensions = set()
+        # 已创建的标签按钮 {tag: button}，搜索和点击时复用，只在标签集合变化时清除
+        self._tag_button_cache = {}
+        # 选中扩展名集合的缓存，扩展名过滤切换时置为 None
+        self._allowed_exts_cache = None
+        # 按 (数量降序, 标签) 排好序的 [(tag, tag.lower())]，标签集合或计数变化时置为 None，下次刷新时重建
+        self._sorted_tags = None
+        # 二元组索引 {bigram: {_sorted_tags 下标}}，与 _sorted_tags 同时重建
+        self._tag_bigrams = None
+        # 上一次搜索的 (搜索文本, 匹配的下标列表)，输入追加字符时在其结果中继续筛选
+        self._last_tag_match = None
+        # 标签文字宽度缓存 {tag: width}，所有标签按钮使用同一字体，只需测量一次
+        self._tag_font_metrics = QFontMetrics(QApplication.font())
+        self._tag_width_cache = {}
+        
+        # 连续输入时只在停顿后刷新一次标签按钮
+        self._pending_tag_search = ""
+        self._tag_search_timer = QTimer(self)
+        self._tag_search_timer.setSingleShot(True)
+        self._tag_search_timer.setInterval(TAG_SEARCH_DELAY_MS)
+        self._tag_search_timer.timeout.connect(self._do_tag_search)
+        
+        # 同一轮事件循环内的多次过滤请求合并为一次文件树遍历
+        self._apply_filters_timer = QTimer(self)
+        self._apply_filters_timer.setSingleShot(True)
+        self._apply_filters_timer.setInterval(0)
+        self._apply_filters_timer.timeout.connect(self._apply_filters_now)
     
     def create_tag_filter_ui(self, parent_layout: QVBoxLayout):
         """创建标签过滤UI"""
@@ -112,7 +139,7 @@ class FilterPanelMixin:
                 btn.setFixedWidth(unified_button_width)
                 
                 btn.clicked.connect(lambda checked, extension=ext: self._toggle_extension_filter(extension))
-                ext_buttons[f"dl_{ext}"] = btn
+                ext_buttons[ext] = btn
                 row_layout.addWidget(btn)
             
             ext_grid_layout.addLayout(row_layout)
@@ -122,19 +149,23 @@ class FilterPanelMixin:
         
         parent_layout.addLayout(center_container)
         
-        for ext_key, btn in ext_buttons.items():
+        for btn in ext_buttons.values():
             btn.setEnabled(False)
-            btn.setStyleSheet(EXT_BUTTON_DISABLED_STYLE)
+            # 显示前设置属性，首次显示时即按对应样式绘制
+            btn.setProperty("extState", "disabled")
         
         return {
             "ext_boxes": ext_buttons,
-            "ext_categories_data": ext_categories_data,
-            "prefix": "dl"
+            "ext_categories_data": ext_categories_data
         }
     
+    @pyqtSlot(bool)
     def _on_filter_enabled_changed(self, enabled):
         """标签过滤功能开关状态改变"""
         self._update_tag_filter_ui_state()
+        if enabled:
+            # 未启用时不创建标签按钮，启用后按当前搜索文本生成
+            self._update_tag_buttons_ui(self.tag_filter_input.text().strip())
         self._update_rule_preview()
         self._apply_filters()
     
@@ -146,73 +177,148 @@ class FilterPanelMixin:
     
     def _clear_tag_buttons(self):
         """清除所有动态生成的标签按钮"""
-        while self.tag_buttons_layout.count():
-            item = self.tag_buttons_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        # 从末尾取出，流式布局的列表无需逐个前移元素
+        layout = self.tag_buttons_layout
+        for index in reversed(range(layout.count())):
+            layout.takeAt(index)
+        for button in self._tag_button_cache.values():
+            button.deleteLater()
+        self._tag_button_cache.clear()
+    
+    def _invalidate_tag_index(self):
+        """all_tags 或标签计数变化后调用，使预处理的标签数据在下次刷新时重建"""
+        self._sorted_tags = None
+        self._tag_bigrams = None
+        self._last_tag_match = None
+    
+    def _match_tag_indices(self, search_lower: str) -> list:
+        """返回包含搜索文本的标签在 _sorted_tags 中的下标（保持排序顺序）
+        
+        搜索文本包含上一次的搜索文本时，只需在上一次的结果中筛选；
+        否则用二元组索引取交集得到候选，再逐个确认子串
+        """
+        sorted_tags = self._sorted_tags
+        last = self._last_tag_match
+        if last is not None and last[0] in search_lower:
+            candidates = last[1]
+        elif len(search_lower) >= 2:
+            if self._tag_bigrams is None:
+                bigrams = {}
+                for index, (tag, tag_lower) in enumerate(sorted_tags):
+                    for i in range(len(tag_lower) - 1):
+                        bigrams.setdefault(tag_lower[i:i + 2], set()).add(index)
+                self._tag_bigrams = bigrams
+            postings = [
+                self._tag_bigrams.get(search_lower[i:i + 2], ())
+                for i in range(len(search_lower) - 1)
+            ]
+            postings.sort(key=len)
+            candidates = sorted(set(postings[0]).intersection(*postings[1:]))
+        else:
+            candidates = range(len(sorted_tags))
+        
+        matched = [index for index in candidates if search_lower in sorted_tags[index][1]]
+        self._last_tag_match = (search_lower, matched)
+        return matched
+    
+    def _create_tag_button(self, tag: str) -> QPushButton:
+        """创建标签按钮（每个标签只创建一次）"""
+        button = QPushButton(tag, self.tag_buttons_container)
+        button.setObjectName("tagButton")
+        button.setCheckable(True)
+        
+        button.setMinimumHeight(30)
+        button.setMaximumHeight(35)
+        
+        text_width = self._tag_width_cache.get(tag)
+        if text_width is None:
+            text_width = self._tag_width_cache[tag] = self._tag_font_metrics.horizontalAdvance(tag)
+        button_width = text_width + 20
+        button.setFixedWidth(button_width)
+        
+        button.clicked.connect(lambda checked, t=tag: self._on_tag_button_clicked(t))
+        # objectName 在显示前已设置，首次显示时会按样式表完成 polish，无需手动重新应用
+        return button
     
     def _update_tag_buttons_ui(self, search_text: str = ""):
-        """动态创建并显示标签按钮"""
-        self._clear_tag_buttons()
+        """显示标签按钮
         
+        已创建的按钮直接复用：只调整布局中的顺序、显示状态和选中状态，
+        不在的标签按钮仅隐藏，避免搜索时反复创建和销毁控件
+        """
         if self.all_tags is None:
             self.all_tags = set()
         
-        if not self.all_tags:
+        # 标签过滤未启用时不需要标签按钮，启用时再创建
+        if not self.tag_filter_enabled_checkbox.isChecked():
             return
         
-        tag_counts = self.creator_tags_with_counts if self.creator_tags_with_counts else {}
-        
-        if search_text:
-            search_lower = search_text.lower()
-            filtered_tags = [tag for tag in self.all_tags if search_lower in tag.lower()]
-            
-            filtered_with_counts = [(tag, tag_counts.get(tag, 0)) for tag in filtered_tags]
-            filtered_with_counts.sort(key=lambda x: (-x[1], x[0]))
-            tags_to_display = [tag for tag, count in filtered_with_counts]
+        if self._sorted_tags is None:
+            tag_counts = self.creator_tags_with_counts if self.creator_tags_with_counts else {}
+            self._sorted_tags = [
+                (tag, tag.lower())
+                for tag in sorted(self.all_tags, key=lambda tag: (-tag_counts.get(tag, 0), tag))
+            ]
+        
+        # 按已排好的顺序依次取出，达到字符数上限即停止
+        search_lower = search_text.lower()
+        if search_lower:
+            sorted_tags = self._sorted_tags
+            matched_tags = (sorted_tags[index][0] for index in self._match_tag_indices(search_lower))
         else:
-            tags_with_counts = [(tag, tag_counts.get(tag, 0)) for tag in self.all_tags]
-            tags_with_counts.sort(key=lambda x: (-x[1], x[0]))
-            tags_to_display = [tag for tag, count in tags_with_counts]
+            matched_tags = (tag for tag, tag_lower in self._sorted_tags)
         
         max_total_chars = 96
         total_chars = 0
+        tags_to_display = []
         
-        for tag in tags_to_display:
+        for tag in matched_tags:
             tag_length = len(tag)
             
             if total_chars + tag_length > max_total_chars:
                 break
-                
-            is_selected = tag in self.selected_tags
             
-            button = QPushButton(tag)
-            button.setObjectName("tagButton")
-            button.setCheckable(True)
-            button.setChecked(is_selected)
-            
-            button.setMinimumHeight(30)
-            button.setMaximumHeight(35)
-            
-            font_metrics = button.fontMetrics()
-            text_width = font_metrics.boundingRect(tag).width()
-            if hasattr(font_metrics, 'horizontalAdvance'):
-                text_width = font_metrics.horizontalAdvance(tag)
-            button_width = text_width + 20
-            button.setFixedWidth(button_width)
+            tags_to_display.append(tag)
+            total_chars += tag_length
+        
+        # 按新顺序重新加入布局，布局中只保留需要显示的按钮
+        # 调整期间暂停容器重绘，所有按钮变化后统一刷新一次
+        container = self.tag_buttons_container
+        container.setUpdatesEnabled(False)
+        try:
+            layout = self.tag_buttons_layout
+            while layout.count():
+                layout.takeAt(layout.count() - 1)
             
-            button.clicked.connect(lambda checked, t=tag: self._on_tag_button_clicked(t))
+            cache = self._tag_button_cache
+            displayed = set(tags_to_display)
+            for tag, button in cache.items():
+                if tag not in displayed:
+                    button.setVisible(False)
             
-            button.style().unpolish(button)
-            button.style().polish(button)
+            selected_tags = self.selected_tags
+            for tag in tags_to_display:
+                button = cache.get(tag)
+                if button is None:
+                    button = cache[tag] = self._create_tag_button(tag)
+                button.setChecked(tag in selected_tags)
+                layout.addWidget(button)
+                button.setVisible(True)
             
-            self.tag_buttons_layout.addWidget(button)
-            total_chars += tag_length
+            layout.invalidate()
+        finally:
+            container.setUpdatesEnabled(True)
     
+    @pyqtSlot(str)
     def _on_tag_search_changed(self, text: str):
-        """标签搜索框变化"""
-        search_text = text.strip()
-        self._update_tag_buttons_ui(search_text)
+        """标签搜索框变化，重新计时，停止输入后再刷新"""
+        self._pending_tag_search = text.strip()
+        self._tag_search_timer.start()
+    
+    @pyqtSlot()
+    def _do_tag_search(self):
+        """搜索延迟结束，按最新的搜索文本刷新标签按钮"""
+        self._update_tag_buttons_ui(self._pending_tag_search)
     
     def _on_tag_button_clicked(self, tag: str):
         """标签按钮被点击"""
@@ -221,14 +327,9 @@ class FilterPanelMixin:
         else:
             self.selected_tags.add(tag)
         
-        for i in range(self.tag_buttons_layout.count()):
-            item = self.tag_buttons_layout.itemAt(i)
-            if item and item.widget():
-                button = item.widget()
-                button_tag = button.text()
-                if button_tag == tag:
-                    button.setChecked(tag in self.selected_tags)
-                    break
+        button = self._tag_button_cache.get(tag)
+        if button is not None:
+            button.setChecked(tag in self.selected_tags)
         
         self._update_rule_preview()
         self._apply_filters()
@@ -253,23 +354,25 @@ class FilterPanelMixin:
         
         saved_extensions = self.settings.get("filter_extensions", [])
         
-        for ext_key, btn in self.filter_options["ext_boxes"].items():
-            ext = ext_key.split('_', 1)[1]
-            
+        for ext, btn in self.filter_options["ext_boxes"].items():
             if ext in self.detected_extensions:
                 btn.setEnabled(True)
-                
-                if ext in saved_extensions:
-                    btn.setStyleSheet(EXT_BUTTON_ENABLED_STYLE)
-                else:
-                    btn.setStyleSheet(EXT_BUTTON_DISABLED_FILTER_STYLE)
+                self._set_ext_button_state(btn, "on" if ext in saved_extensions else "off")
             else:
                 btn.setEnabled(False)
-                btn.setStyleSheet(EXT_BUTTON_DISABLED_STYLE)
+                self._set_ext_button_state(btn, "disabled")
+    
+    def _set_ext_button_state(self, btn: QPushButton, state: str):
+        """设置扩展名按钮的样式状态（disabled / on / off），状态未变化时不重新应用样式"""
+        if btn.property("extState") == state:
+            return
+        btn.setProperty("extState", state)
+        btn.style().unpolish(btn)
+        btn.style().polish(btn)
     
     def _toggle_extension_filter(self, extension: str):
         """切换扩展名过滤状态"""
-        btn = self.filter_options["ext_boxes"][f"dl_{extension}"]
+        btn = self.filter_options["ext_boxes"][extension]
         
         if not btn.isEnabled():
             return
@@ -278,18 +381,20 @@ class FilterPanelMixin:
         
         if extension in saved_extensions:
             saved_extensions.remove(extension)
-            btn.setStyleSheet(EXT_BUTTON_DISABLED_FILTER_STYLE)
+            self._set_ext_button_state(btn, "off")
         else:
             saved_extensions.append(extension)
-            btn.setStyleSheet(EXT_BUTTON_ENABLED_STYLE)
+            self._set_ext_button_state(btn, "on")
         
+        self._allowed_exts_cache = None
         self._save_setting("filter_extensions", saved_extensions)
         self._apply_filters()
     
-    def get_selected_extensions(self, ext_categories_info: dict) -> set[str]:
-        """获取选中的扩展名集合"""
-        saved_extensions = self.settings.get("filter_extensions", [])
-        return set(saved_extensions)
+    def get_selected_extensions(self, ext_categories_info: dict) -> frozenset[str]:
+        """获取选中的扩展名集合（结果会被缓存，返回不可变集合）"""
+        if self._allowed_exts_cache is None:
+            self._allowed_exts_cache = frozenset(self.settings.get("filter_extensions", []))
+        return self._allowed_exts_cache
     
     def is_ext_match(self, file_ext: str, allowed_exts: set[str]) -> bool:
         """判断文件扩展名是否匹配过滤器"""
@@ -303,29 +408,43 @@ class FilterPanelMixin:
         return False
     
     def _apply_filters(self):
+        """请求更新文件树的勾选状态，在事件循环空闲时统一执行"""
+        self._apply_filters_timer.start()
+    
+    @pyqtSlot()
+    def _apply_filters_now(self):
         """根据扩展名过滤器更新文件树的勾选状态"""
         if getattr(self, 'is_detecting', False):
             return
         
         allowed_exts = self.get_selected_extensions(self.filter_options)
-        
-        iterator = QTreeWidgetItemIterator(self.file_tree)
-        while iterator.value():
-            item = iterator.value()
-            if not item.parent():
-                item.setHidden(False)
-                
-                for i in range(item.childCount()):
-                    child = item.child(i)
-                    file_data = child.data(0, Qt.ItemDataRole.UserRole)
-                    if not file_data or "name" not in file_data:
-                        continue
-                    file_ext = os.path.splitext(file_data["name"])[1].lower()
-                    
-                    child.setHidden(False)
-                    child.setCheckState(0, Qt.CheckState.Checked if self.is_ext_match(file_ext, allowed_exts) else Qt.CheckState.Unchecked)
+        has_numeric = ".001" in allowed_exts
+        checked, unchecked = Qt.CheckState.Checked, Qt.CheckState.Unchecked
+        user_role = Qt.ItemDataRole.UserRole
+        
+        # 文件项都是帖子项的直接子项，只需遍历顶层项，无需迭代整棵树
+        tree = self.file_tree
+        for index in range(tree.topLevelItemCount()):
+            item = tree.topLevelItem(index)
+            item.setHidden(False)
             
-            iterator += 1
+            for i in range(item.childCount()):
+                child = item.child(i)
+                file_data = child.data(0, user_role)
+                if not file_data or "name" not in file_data:
+                    continue
+                # 扩展名在创建文件项时已计算
+                file_ext = file_data.get("ext")
+                if file_ext is None:
+                    file_ext = os.path.splitext(file_data["name"])[1].lower()
+                
+                child.setHidden(False)
+                matched = file_ext in allowed_exts or (
+                    has_numeric and len(file_ext) == 4 and file_ext[1:].isdigit()
+                )
+                state = checked if matched else unchecked
+                if child.checkState(0) != state:
+                    child.setCheckState(0, state)
     
     def refresh_filter_panel_texts(self):
         """刷新过滤面板的UI文本"""
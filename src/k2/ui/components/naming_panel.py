@@ -1,7 +1,9 @@
 """命名选项面板组件"""
+import re
+from types import MappingProxyType
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit, 
-    QGroupBox, QScrollArea, QWidget, QSizePolicy
+    QGroupBox, QScrollArea, QWidget, QSizePolicy, QApplication
 )
 from PyQt6.QtGui import QFontMetrics
 from PyQt6.QtCore import Qt
@@ -11,41 +13,72 @@ from ..styles import UNDERLINE_INPUT_STYLE, MUTED_LABEL_STYLE
 from ..layouts import FlowLayout
 
 
+# 命名预览使用的示例数据
+_PREVIEW_DATA = {
+    'service': 'Patreon', 'creator_id': '1234567', 'creator_name': 'smk',
+    'post_id': '12345678', 'post_title': 'Hi', 'file_name_original': 'name',
+    'file_ext': '.jpg'
+}
+# 模板变量 {name}，一次扫描完成替换
+_TEMPLATE_VAR_RE = re.compile(r"\{(\w+)\}")
+
+# 各标签页的快捷命名选项（0: 作者文件夹, 1: 帖子文件夹, 2: 文件）
+_NAMING_OPTIONS_BY_TAB_ZH = MappingProxyType({
+    0: ("作者名", "作者ID", "平台"),
+    1: ("帖子标题", "帖子ID"),
+    2: ("平台", "作者ID", "作者名", "帖子ID", "帖子标题", "原始名", "扩展名")
+})
+
+_NAMING_OPTIONS_BY_TAB_EN = MappingProxyType({
+    0: ("Creator", "ID", "Platform"),
+    1: ("Title", "Post ID"),
+    2: ("Platform", "ID", "Creator", "Post ID", "Title", "Name", "Ext")
+})
+
+# 按钮文字对应的模板变量（中英文共用）
+_BUTTON_TEXT_TO_VARIABLE = MappingProxyType({
+    "作者名": "{creator_name}",
+    "作者ID": "{creator_id}",
+    "平台": "{service}",
+    "帖子标题": "{post_title}",
+    "帖子ID": "{post_id}",
+    "原始名": "{file_name_original}",
+    "扩展名": "{file_ext}",
+    "Creator": "{creator_name}",
+    "ID": "{creator_id}",
+    "Platform": "{service}",
+    "Title": "{post_title}",
+    "Post ID": "{post_id}",
+    "Name": "{file_name_original}",
+    "Ext": "{file_ext}"
+})
+
+
 class NamingPanelMixin:
     """命名选项面板功能混入类"""
     
     def init_naming_panel(self):
         """初始化命名面板相关变量"""
+        # 当前标签页显示的命名按钮
         self.naming_buttons = []
-        
-        self.naming_options_by_tab_zh = {
-            0: ["作者名", "作者ID", "平台"],
-            1: ["帖子标题", "帖子ID"],
-            2: ["平台", "作者ID", "作者名", "帖子ID", "帖子标题", "原始名", "扩展名"]
-        }
-        
-        self.naming_options_by_tab_en = {
-            0: ["Creator", "ID", "Platform"],
-            1: ["Title", "Post ID"],
-            2: ["Platform", "ID", "Creator", "Post ID", "Title", "Name", "Ext"]
-        }
-        
-        self.button_text_to_variable = {
-            "作者名": "{creator_name}",
-            "作者ID": "{creator_id}",
-            "平台": "{service}",
-            "帖子标题": "{post_title}",
-            "帖子ID": "{post_id}",
-            "原始名": "{file_name_original}",
-            "扩展名": "{file_ext}",
-            "Creator": "{creator_name}",
-            "ID": "{creator_id}",
-            "Platform": "{service}",
-            "Title": "{post_title}",
-            "Post ID": "{post_id}",
-            "Name": "{file_name_original}",
-            "Ext": "{file_ext}"
-        }
+        # 各标签页的命名按钮 {tab_index: [button]}，只在首次显示或语言切换后创建
+        self._naming_buttons_per_tab = {}
+        # 命名按钮文字宽度缓存 {text: width}，语言切换时清空
+        self._naming_font_metrics = QFontMetrics(QApplication.font())
+        self._naming_width_cache = {}
+        
+        self.naming_options_by_tab_zh = _NAMING_OPTIONS_BY_TAB_ZH
+        self.naming_options_by_tab_en = _NAMING_OPTIONS_BY_TAB_EN
+        self.button_text_to_variable = _BUTTON_TEXT_TO_VARIABLE
+        
+        # 当前语言的选项列表，语言切换时在 refresh_naming_panel_texts 中更新
+        self._current_naming_options = self._get_naming_options_for_language()
+    
+    def _get_naming_options_for_language(self) -> dict:
+        """返回当前语言对应的各标签页命名选项"""
+        if self.settings.get("language", "zh_CN") == "en_US":
+            return self.naming_options_by_tab_en
+        return self.naming_options_by_tab_zh
     
     def create_naming_options_panel(self, parent_layout: QVBoxLayout):
         """创建命名选项面板UI"""
@@ -97,6 +130,8 @@ class NamingPanelMixin:
         
         self.naming_tabs_config = tab_configs
         self.naming_inputs = {}
+        # 各输入框的预览刷新函数 {setting_key: update_preview}，语言切换时直接调用
+        self._naming_preview_updaters = {}
         
         parent_layout.addSpacing(5)
         
@@ -166,7 +201,6 @@ class NamingPanelMixin:
         
         line_edit = QLineEdit(self.settings.get(setting_key, ""))
         line_edit.setStyleSheet(UNDERLINE_INPUT_STYLE)
-        line_edit.textChanged.connect(lambda text, key=setting_key: self._save_setting(key, text))
         input_layout.addWidget(line_edit)
         
         preview_label = QLabel()
@@ -174,22 +208,25 @@ class NamingPanelMixin:
         preview_label.setStyleSheet(MUTED_LABEL_STYLE)
         input_layout.addWidget(preview_label)
         
-        def update_preview():
-            dummy_data = {
-                'service': 'Patreon', 'creator_id': '1234567', 'creator_name': 'smk',
-                'post_id': '12345678', 'post_title': 'Hi', 'file_name_original': 'name', 
-                'file_ext': '.jpg'
-            }
-            template = line_edit.text()
-            preview_text = template
-            for key, value in dummy_data.items():
-                preview_text = preview_text.replace(f"{{{key}}}", str(value) if value is not None else "")
+        def update_preview(text=None):
+            if text is None:
+                text = line_edit.text()
+            # 未知变量保持原样
+            preview_text = _TEMPLATE_VAR_RE.sub(
+                lambda m: _PREVIEW_DATA.get(m.group(1), m.group(0)), text
+            )
             preview_label.setText(_("preview.preview_label", text=preview_text))
         
-        line_edit.textChanged.connect(update_preview)
+        def on_text_changed(text):
+            # 每次输入只触发一个回调：保存设置并刷新预览
+            self._save_setting(setting_key, text)
+            update_preview(text)
+        
+        line_edit.textChanged.connect(on_text_changed)
         update_preview()
         
         self.naming_inputs[setting_key] = line_edit
+        self._naming_preview_updaters[setting_key] = update_preview
         
         return input_widget
     
@@ -204,42 +241,62 @@ class NamingPanelMixin:
         self.current_naming_tab = tab_index
         self._create_naming_buttons(tab_index)
     
+    def _build_naming_buttons(self):
+        """按当前语言创建所有标签页的快捷命名按钮，替换已有按钮"""
+        layout = self.naming_buttons_layout
+        while layout.count():
+            layout.takeAt(layout.count() - 1)
+        for buttons in self._naming_buttons_per_tab.values():
+            for button in buttons:
+                button.setParent(None)
+                button.deleteLater()
+        self._naming_buttons_per_tab = {}
+        self.naming_buttons = []
+        
+        width_cache = self._naming_width_cache
+        for tab_index, options in self._current_naming_options.items():
+            buttons = []
+            for option in options:
+                button = QPushButton(option, self.naming_buttons_container)
+                button.setObjectName("namingButton")
+                button.setVisible(False)
+                
+                button.setMinimumHeight(30)
+                button.setMaximumHeight(35)
+                
+                # 选项宽度只测量一次
+                if option not in width_cache:
+                    width_cache[option] = self._naming_font_metrics.horizontalAdvance(option)
+                button.setFixedWidth(width_cache[option] + 20)
+                
+                button.clicked.connect(lambda checked, text=option: self._on_naming_button_clicked(text))
+                buttons.append(button)
+            self._naming_buttons_per_tab[tab_index] = buttons
+    
     def _create_naming_buttons(self, tab_index=0):
-        """创建快捷命名按钮"""
-        for button in self.naming_buttons:
-            button.setParent(None)
-            button.deleteLater()
-        self.naming_buttons.clear()
-        
-        while self.naming_buttons_layout.count():
-            item = self.naming_buttons_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        current_lang = self.settings.get("language", "zh_CN")
-        if current_lang == "en_US":
-            options = self.naming_options_by_tab_en.get(tab_index, [])
-        else:
-            options = self.naming_options_by_tab_zh.get(tab_index, [])
-        
-        for option in options:
-            button = QPushButton(option)
-            button.setObjectName("namingButton")
-            
-            button.setMinimumHeight(30)
-            button.setMaximumHeight(35)
+        """显示指定标签页的快捷命名按钮
+        
+        按钮创建后一直复用，切换标签页时只替换布局中的按钮并切换显示状态
+        """
+        if not self._naming_buttons_per_tab:
+            self._build_naming_buttons()
+        
+        # 切换期间暂停容器重绘，所有按钮加入后统一刷新一次
+        container = self.naming_buttons_container
+        container.setUpdatesEnabled(False)
+        try:
+            layout = self.naming_buttons_layout
+            while layout.count():
+                layout.takeAt(layout.count() - 1)
+            for button in self.naming_buttons:
+                button.setVisible(False)
             
-            font_metrics = button.fontMetrics()
-            text_width = font_metrics.boundingRect(option).width()
-            if hasattr(font_metrics, 'horizontalAdvance'):
-                text_width = font_metrics.horizontalAdvance(option)
-            button_width = text_width + 20
-            button.setFixedWidth(button_width)
-            
-            button.clicked.connect(lambda checked, text=option: self._on_naming_button_clicked(text))
-            
-            self.naming_buttons.append(button)
-            self.naming_buttons_layout.addWidget(button)
+            self.naming_buttons = list(self._naming_buttons_per_tab.get(tab_index, ()))
+            for button in self.naming_buttons:
+                layout.addWidget(button)
+                button.setVisible(True)
+        finally:
+            container.setUpdatesEnabled(True)
     
     def _on_naming_button_clicked(self, button_text: str):
         """处理命名按钮点击事件"""
@@ -278,18 +335,17 @@ class NamingPanelMixin:
                     button_width = max(80, bold_width + 25)
                     btn.setFixedWidth(button_width)
         
-        if hasattr(self, 'naming_tabs_config') and hasattr(self, 'naming_tab_input_widgets'):
-            for i, (title, tab_id, setting_key, variables) in enumerate(self.naming_tabs_config):
-                old_widget = self.naming_tab_input_widgets[i]
-                old_widget.setParent(None)
-                old_widget.deleteLater()
-                
-                new_widget = self._create_naming_input_widget(setting_key)
-                new_widget.setVisible(i == self.current_naming_tab)
-                self.naming_tab_input_widgets[i] = new_widget
-                
-                self.input_preview_widget.layout().addWidget(new_widget)
+        # 输入框保持不变，只按新语言刷新预览文本
+        if hasattr(self, '_naming_preview_updaters'):
+            for update_preview in self._naming_preview_updaters.values():
+                update_preview()
+        
+        self._current_naming_options = self._get_naming_options_for_language()
+        self._naming_font_metrics = QFontMetrics(QApplication.font())
+        self._naming_width_cache.clear()
         
         if hasattr(self, 'current_naming_tab'):
+            # 选项文字随语言变化，重新创建所有标签页的按钮
+            self._build_naming_buttons()
             self._create_naming_buttons(self.current_naming_tab)
 
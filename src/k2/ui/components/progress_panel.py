@@ -1,20 +1,49 @@
 """进度条面板组件"""
+import time
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from ...utils.i18n import _
 
 
+# 下载进度刷新的最小间隔（秒），间隔内的更新合并为最后一次
+DOWNLOAD_UPDATE_INTERVAL = 0.08
+
+# 字节转换为 MiB 的系数
+_INV_MB = 1.0 / (1024 * 1024)
+
+
 class ProgressPanel(QWidget):
     """进度条面板，显示下载/检测进度"""
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._rebuild_strings()
         self._setup_ui()
         self._reset()
         
         # 保存当前状态，用于语言切换时刷新
         self._current_state = None  # 'idle', 'config_loaded', 'detecting', 'downloading', 'paused', 'terminated', 'completed'
         self._current_params = {}
+        
+        # 下载进度节流：上次刷新时间，以及间隔结束时补发最后一次被跳过的更新
+        self._last_update_ts = 0.0
+        self._pending_download_args = None
+        self._pending_timer = QTimer(self)
+        self._pending_timer.setSingleShot(True)
+        self._pending_timer.timeout.connect(self._flush_pending)
+    
+    def _rebuild_strings(self):
+        """解析各状态固定的翻译文本，语言切换时重新解析"""
+        self._s_config_loaded = _("progress.config_loaded")
+        self._s_detection_completed = _("progress.detection_completed")
+        self._s_detecting = _("progress.detecting")
+        self._s_downloading = _("progress.downloading")
+        self._s_terminated = _("progress.terminated")
+        self._s_paused = _("progress.paused")
+        self._s_completed = _("progress.completed")
+        # 当前文件大小文本的缓存 (已下载, 总大小) -> 文本，随语言一起失效
+        self._file_size_key = None
+        self._file_size_text = ""
     
     def _setup_ui(self):
         """设置UI"""
@@ -67,23 +96,37 @@ class ProgressPanel(QWidget):
     
     def _reset(self):
         """重置所有显示"""
-        self.status_label.setText("")
-        self.retry_label.setText("")
-        self.process_label.setText("")
-        self.file_progress_label.setText("")
-        self.progress_bar.setValue(0)
+        self._set_label(self.status_label, "")
+        self._set_label(self.retry_label, "")
+        self._set_label(self.process_label, "")
+        self._set_label(self.file_progress_label, "")
+        if self.progress_bar.value() != 0:
+            self.progress_bar.setValue(0)
+    
+    @staticmethod
+    def _set_label(label: QLabel, text: str):
+        """文本变化时才更新标签，避免无意义的重绘和重新布局"""
+        if label.text() != text:
+            label.setText(text)
+    
+    def _set_progress(self, maximum: int, value: int):
+        """最大值或当前值变化时才更新进度条"""
+        bar = self.progress_bar
+        if bar.maximum() != maximum:
+            bar.setMaximum(maximum)
+        if bar.value() != value:
+            bar.setValue(value)
     
     def show_config_loaded(self):
         """显示配置加载完成"""
         self._current_state = 'config_loaded'
         self._current_params = {}
         
-        self.status_label.setText(_("progress.config_loaded"))
-        self.retry_label.setText("")
-        self.process_label.setText("")
-        self.file_progress_label.setText("")
-        self.progress_bar.setMaximum(100)  # 确保不在不确定模式
-        self.progress_bar.setValue(100)
+        self._set_label(self.status_label, self._s_config_loaded)
+        self._set_label(self.retry_label, "")
+        self._set_label(self.process_label, "")
+        self._set_label(self.file_progress_label, "")
+        self._set_progress(100, 100)  # 确保不在不确定模式
     
     def show_detecting(self, loaded_count: int, total_count: int = None):
         """显示检测状态
@@ -97,26 +140,23 @@ class ProgressPanel(QWidget):
         
         # 如果已经完成（loaded == total且都>0），显示完成状态
         if total_count and total_count > 0 and loaded_count == total_count:
-            self.status_label.setText(_("progress.detection_completed"))
-            self.process_label.setText(_("progress.detected_posts_with_total", loaded=loaded_count, total=total_count))
-            self.progress_bar.setMaximum(total_count)
-            self.progress_bar.setValue(total_count)
+            self._set_label(self.status_label, self._s_detection_completed)
+            self._set_label(self.process_label, _("progress.detected_posts_with_total", loaded=loaded_count, total=total_count))
+            self._set_progress(total_count, total_count)
         else:
-            self.status_label.setText(_("progress.detecting"))
+            self._set_label(self.status_label, self._s_detecting)
             # 显示进度格式：已检测123/456个帖子 或 已检测123个帖子
             if total_count and total_count > 0:
-                self.process_label.setText(_("progress.detecting_posts_with_total", loaded=loaded_count, total=total_count))
+                self._set_label(self.process_label, _("progress.detecting_posts_with_total", loaded=loaded_count, total=total_count))
                 # 使用确定的进度条
-                self.progress_bar.setMaximum(total_count)
-                self.progress_bar.setValue(loaded_count)
+                self._set_progress(total_count, loaded_count)
             else:
-                self.process_label.setText(_("progress.detecting_posts", count=loaded_count))
+                self._set_label(self.process_label, _("progress.detecting_posts", count=loaded_count))
                 # 没有总数时也使用确定进度，但从0开始
-                self.progress_bar.setMaximum(100)
-                self.progress_bar.setValue(0)
+                self._set_progress(100, 0)
         
-        self.retry_label.setText("")
-        self.file_progress_label.setText("")
+        self._set_label(self.retry_label, "")
+        self._set_label(self.file_progress_label, "")
     
     def show_downloading(self, downloaded_count: int, total_count: int = None, 
                         current_file_size: tuple = None, retry_count: int = 0):
@@ -128,6 +168,7 @@ class ProgressPanel(QWidget):
             current_file_size: 当前文件进度 (已下载字节, 总字节)
             retry_count: 正在重试的文件数
         """
+        was_downloading = self._current_state == 'downloading'
         self._current_state = 'downloading'
         self._current_params = {
             'downloaded_count': downloaded_count,
@@ -136,19 +177,50 @@ class ProgressPanel(QWidget):
             'retry_count': retry_count
         }
         
-        self.status_label.setText(_("progress.downloading"))
+        # 进入下载状态时立即显示；之后间隔内的更新只记录参数，由定时器补发最后一次
+        args = (downloaded_count, total_count, current_file_size, retry_count)
+        now = time.monotonic()
+        remaining = DOWNLOAD_UPDATE_INTERVAL - (now - self._last_update_ts)
+        if was_downloading and remaining > 0:
+            self._pending_download_args = args
+            if not self._pending_timer.isActive():
+                self._pending_timer.start(int(remaining * 1000) + 1)
+            return
+        
+        self._last_update_ts = now
+        self._pending_download_args = None
+        self._pending_timer.stop()
+        self._render_downloading(*args)
+    
+    def _flush_pending(self):
+        """补发节流期间最后一次下载进度（状态已切换时丢弃）"""
+        args = self._pending_download_args
+        self._pending_download_args = None
+        if args is None or self._current_state != 'downloading':
+            return
+        self._last_update_ts = time.monotonic()
+        self._render_downloading(*args)
+    
+    def _render_downloading(self, downloaded_count: int, total_count: int,
+                            current_file_size: tuple, retry_count: int):
+        """按给定参数刷新下载状态的各个控件"""
+        self._set_label(self.status_label, self._s_downloading)
         
         if retry_count > 0:
-            self.retry_label.setText(_("progress.retrying_files", count=retry_count))
+            self._set_label(self.retry_label, _("progress.retrying_files", count=retry_count))
         else:
-            self.retry_label.setText("")
+            self._set_label(self.retry_label, "")
         
-        self.process_label.setText(_("progress.downloaded_files", count=downloaded_count))
+        self._set_label(self.process_label, _("progress.downloaded_files", count=downloaded_count))
         
         if current_file_size:
-            downloaded_mb = current_file_size[0] / (1024 * 1024)
-            total_mb = current_file_size[1] / (1024 * 1024)
-            self.file_progress_label.setText(_("progress.file_size_mb", downloaded=f"{downloaded_mb:.1f}", total=f"{total_mb:.1f}"))
+            # 大小未变化时复用上次格式化的文本
+            if current_file_size != self._file_size_key:
+                downloaded_mb = current_file_size[0] * _INV_MB
+                total_mb = current_file_size[1] * _INV_MB
+                self._file_size_key = current_file_size
+                self._file_size_text = _("progress.file_size_mb", downloaded=f"{downloaded_mb:.1f}", total=f"{total_mb:.1f}")
+            self._set_label(self.file_progress_label, self._file_size_text)
             
             # 显示当前文件进度
             if total_count and total_count > 0:
@@ -158,42 +230,36 @@ class ProgressPanel(QWidget):
                 if current_file_size[1] > 0:
                     current_file_progress = (current_file_size[0] / current_file_size[1]) / total_count * 100
                     file_progress += current_file_progress
-                self.progress_bar.setMaximum(100)
-                self.progress_bar.setValue(int(file_progress))
+                self._set_progress(100, int(file_progress))
             else:
                 # 否则只显示当前文件进度
                 if current_file_size[1] > 0:
                     progress = int((current_file_size[0] / current_file_size[1]) * 100)
-                    self.progress_bar.setMaximum(100)
-                    self.progress_bar.setValue(progress)
+                    self._set_progress(100, progress)
                 else:
                     # 文件大小未知时，显示空进度条
-                    self.progress_bar.setMaximum(100)
-                    self.progress_bar.setValue(0)
+                    self._set_progress(100, 0)
         else:
-            self.file_progress_label.setText("")
+            self._set_label(self.file_progress_label, "")
             # 如果有总数，显示整体进度
             if total_count and total_count > 0:
                 progress = int((downloaded_count / total_count) * 100)
-                self.progress_bar.setMaximum(100)
-                self.progress_bar.setValue(progress)
+                self._set_progress(100, progress)
             else:
                 # 没有当前文件进度时，显示空进度条而非不确定状态
-                self.progress_bar.setMaximum(100)
-                self.progress_bar.setValue(0)
+                self._set_progress(100, 0)
     
     def show_terminated(self):
         """显示已终止状态"""
         self._current_state = 'terminated'
         self._current_params = {}
         
-        self.status_label.setText(_("progress.terminated"))
-        self.retry_label.setText("")
-        self.process_label.setText("")
-        self.file_progress_label.setText("")
+        self._set_label(self.status_label, self._s_terminated)
+        self._set_label(self.retry_label, "")
+        self._set_label(self.process_label, "")
+        self._set_label(self.file_progress_label, "")
         # 进度条为空
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(0)
+        self._set_progress(100, 0)
     
     def show_idle(self):
         """显示空闲状态（隐藏进度条）"""
@@ -206,26 +272,25 @@ class ProgressPanel(QWidget):
         self._current_state = 'paused'
         self._current_params = {}
         
-        self.status_label.setText(_("progress.paused"))
-        self.retry_label.setText("")
-        self.file_progress_label.setText("")
+        self._set_label(self.status_label, self._s_paused)
+        self._set_label(self.retry_label, "")
+        self._set_label(self.file_progress_label, "")
         # 进度条为空且不动
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(0)
+        self._set_progress(100, 0)
     
     def show_completed(self):
         """显示完成状态"""
         self._current_state = 'completed'
         self._current_params = {}
         
-        self.status_label.setText(_("progress.completed"))
-        self.retry_label.setText("")
-        self.file_progress_label.setText("")
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(100)
+        self._set_label(self.status_label, self._s_completed)
+        self._set_label(self.retry_label, "")
+        self._set_label(self.file_progress_label, "")
+        self._set_progress(100, 100)
     
     def refresh_texts(self):
         """刷新所有文本（用于语言切换）"""
+        self._rebuild_strings()
         if self._current_state == 'idle':
             self._reset()
         elif self._current_state == 'config_loaded':
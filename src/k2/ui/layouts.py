@@ -1,8 +1,9 @@
 """
 自定义布局类
 """
+import collections
 from PyQt6.QtWidgets import QLayout
-from PyQt6.QtCore import Qt, QRect, QSize, QPoint
+from PyQt6.QtCore import Qt, QRect, QSize
 
 
 class BaseFlowLayout(QLayout):
@@ -13,17 +14,37 @@ class BaseFlowLayout(QLayout):
             self.setContentsMargins(margin, margin, margin, margin)
         self.setSpacing(spacing)
         self.item_list = []
+        # heightForWidth 结果缓存 {width: height}，只保留最近使用的几个宽度
+        self._hfw_cache = collections.OrderedDict()
+        # 控件推荐尺寸缓存 {widget: (w, h)}，布局失效时清空
+        self._sh_cache = {}
+        # minimumSize 结果缓存，布局失效时清空
+        self._min_size_cache = None
 
-    def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
-
+    HFW_CACHE_SIZE = 8
+    
+    def _clear_caches(self):
+        self._hfw_cache.clear()
+        self._sh_cache.clear()
+        self._min_size_cache = None
+    
+    def invalidate(self):
+        # 控件尺寸或布局内容变化时 Qt 会调用此方法
+        self._clear_caches()
+        super().invalidate()
+    
+    def _hint_size(self, widget) -> tuple:
+        """返回控件的推荐尺寸 (w, h)，同一次布局内只向 Qt 查询一次"""
+        size = self._sh_cache.get(widget)
+        if size is None:
+            hint = widget.sizeHint()
+            size = self._sh_cache[widget] = (hint.width(), hint.height())
+        return size
+    
     def addItem(self, item):
         self.item_list.append(item)
         # 清除缓存
-        if hasattr(self, '_height_cache_key'):
-            delattr(self, '_height_cache_key')
+        self._clear_caches()
 
     def count(self):
         return len(self.item_list)
@@ -35,6 +56,7 @@ class BaseFlowLayout(QLayout):
 
     def takeAt(self, index):
         if 0 <= index < len(self.item_list):
+            self._clear_caches()
             return self.item_list.pop(index)
         return None
 
@@ -49,16 +71,19 @@ class BaseFlowLayout(QLayout):
         if not self.item_list or width <= 0:
             return 50
         
-        # 缓存计算结果，避免重复计算
-        cache_key = (width, len(self.item_list))
-        if hasattr(self, '_height_cache') and self._height_cache_key == cache_key:
-            return self._height_cache_value
+        # 缓存计算结果，避免重复计算（元素变化时缓存已在 addItem/takeAt/invalidate 中清空）
+        cache = self._hfw_cache
+        height = cache.get(width)
+        if height is not None:
+            cache.move_to_end(width)
+            return height
         
         height = self._do_layout(QRect(0, 0, width, 0), True)
         
         # 缓存结果
-        self._height_cache_key = cache_key
-        self._height_cache_value = height
+        cache[width] = height
+        if len(cache) > self.HFW_CACHE_SIZE:
+            cache.popitem(last=False)
         
         return height
 
@@ -75,43 +100,50 @@ class BaseFlowLayout(QLayout):
         if not self.item_list:
             return QSize(200, 50)
         
+        # 元素和尺寸未变化时直接返回上次结果（缓存在 addItem/takeAt/invalidate 中清空）
+        if self._min_size_cache is not None:
+            return QSize(self._min_size_cache)
+        
         # 限制遍历数量，避免大量元素时性能问题
         sample_size = min(len(self.item_list), 50)
         
-        # 计算所需最小宽度（采样最宽的元素）
+        # 单次遍历采样：同时取最宽元素的宽度和前几个元素的平均高度
         min_width = 200
-        for i in range(sample_size):
-            widget = self.item_list[i].widget()
+        total_height = 0
+        count = 0
+        for item in self.item_list[:sample_size]:
+            widget = item.widget()
             if widget:
-                min_width = max(min_width, widget.sizeHint().width())
+                w, h = self._hint_size(widget)
+                if w > min_width:
+                    min_width = w
+                total_height += h
+                count += 1
         
         # 估算最小高度（避免遍历所有元素）
         spacing = self.spacing() if self.spacing() > 0 else 5
-        avg_height = 35  # 假设平均高度
-        
-        if sample_size > 0:
-            # 计算前几个元素的平均高度
-            total_height = 0
-            count = 0
-            for i in range(sample_size):
-                widget = self.item_list[i].widget()
-                if widget:
-                    total_height += widget.sizeHint().height()
-                    count += 1
-            if count > 0:
-                avg_height = total_height / count
+        avg_height = total_height / count if count > 0 else 35  # 无可用元素时假设平均高度
         
         # 估算总高度：元素数量 * 平均高度（这只是估算，不需要精确）
         estimated_height = int(len(self.item_list) * (avg_height + spacing) / 4)  # 假设4列
         
-        return QSize(min_width, max(estimated_height, 50))
+        self._min_size_cache = QSize(min_width, max(estimated_height, 50))
+        return QSize(self._min_size_cache)
 
     def _calculate_rows(self, rect):
-        """计算每行包含的元素（公共逻辑）"""
+        """计算每行包含的元素（公共逻辑）
+        
+        Returns:
+            (rows, row_widths, row_heights, spacing)，rows 中每行为 (item, 宽, 高) 元组列表，
+            row_widths/row_heights 为对应行的自然宽度（含间距）和最大高度
+        """
         spacing = self.spacing() if self.spacing() > 0 else 5
         rows = []
+        row_widths = []
+        row_heights = []
         current_row = []
         current_width = 0
+        current_height = 0
         
         # 硬性宽度限制：为布局边距和滚动条预留足够空间
         # 减去左右边距 + 滚动条宽度 + 安全边距
@@ -122,7 +154,7 @@ class BaseFlowLayout(QLayout):
             if not widget:
                 continue
                 
-            item_width = widget.sizeHint().width()
+            item_width, item_height = self._hint_size(widget)
             
             # 计算添加此按钮后的总宽度
             if current_row:
@@ -133,16 +165,23 @@ class BaseFlowLayout(QLayout):
             # 硬性检查：如果添加此按钮会超过限制，必须换行
             if current_row and new_width > hard_width_limit:
                 rows.append(current_row)
-                current_row = [item]
+                row_widths.append(current_width)
+                row_heights.append(current_height)
+                current_row = [(item, item_width, item_height)]
                 current_width = item_width
+                current_height = item_height
             else:
-                current_row.append(item)
+                current_row.append((item, item_width, item_height))
                 current_width = new_width
+                if item_height > current_height:
+                    current_height = item_height
         
         if current_row:
             rows.append(current_row)
+            row_widths.append(current_width)
+            row_heights.append(current_height)
         
-        return rows, spacing
+        return rows, row_widths, row_heights, spacing
 
     def _do_layout(self, rect, test_only):
         """布局逻辑，由子类实现"""
@@ -159,60 +198,30 @@ class FlowLayout(BaseFlowLayout):
         if not self.item_list:
             return 0
         
-        rows, spacing = self._calculate_rows(rect)
+        rows, row_widths, row_heights, spacing = self._calculate_rows(rect)
+        if not rows:
+            return 0
         
         # 计算总内容高度，用于垂直居中
-        total_height = 0
-        if rows:
-            for row in rows:
-                if row:
-                    row_height = max(item.widget().sizeHint().height() for item in row if item.widget())
-                    total_height += row_height
-            if len(rows) > 1:
-                total_height += spacing * (len(rows) - 1)
+        total_height = sum(row_heights) + spacing * (len(rows) - 1)
         
         # 始终进行垂直居中
         y_offset = max(0, (rect.height() - total_height) // 2)
         y = rect.y() + y_offset
         
         # 布局每一行
-        for row in rows:
-            if not row:
-                continue
-                
-            # 计算这一行的总宽度
-            row_width = sum(item.widget().sizeHint().width() for item in row)
-            row_width += spacing * (len(row) - 1) if len(row) > 1 else 0
-            
-            # 居中对齐
-            start_x = rect.x() + (rect.width() - row_width) // 2
-            
-            # 布局这一行的元素
-            x = start_x
-            line_height = 0
-            
-            for i, item in enumerate(row):
-                widget = item.widget()
-                item_width = widget.sizeHint().width()
-                item_height = widget.sizeHint().height()
-                
-                if not test_only:
-                    item.setGeometry(QRect(QPoint(x, y), widget.sizeHint()))
-                
-                # 只在非最后一个元素后添加间距
-                if i < len(row) - 1:
+        for row, row_width, row_height in zip(rows, row_widths, row_heights):
+            if not test_only:
+                # 居中对齐
+                x = rect.x() + (rect.width() - row_width) // 2
+                for item, item_width, item_height in row:
+                    item.setGeometry(QRect(x, y, item_width, item_height))
                     x += item_width + spacing
-                else:
-                    x += item_width
-                line_height = max(line_height, item_height)
             
-            y += line_height + spacing
+            y += row_height + spacing
         
         # 返回总布局高度（去掉最后一行后的多余间距）
-        total_layout_height = y - rect.y()
-        if rows:
-            total_layout_height -= spacing  # 移除最后一行后的多余间距
-        return total_layout_height
+        return y - rect.y() - spacing
 
 
 class JustifyFlowLayout(BaseFlowLayout):
@@ -234,86 +243,34 @@ class JustifyFlowLayout(BaseFlowLayout):
         if not self.item_list:
             return 0
         
-        # 定义统一的可用宽度（必须与 _calculate_rows 一致）
-        spacing = self.spacing() if self.spacing() > 0 else 5
-        available_width = rect.width()  # 与基类 _calculate_rows 保持一致，使用全部宽度
-        
-        # 手动计算行分布（确保与布局使用相同的宽度）
-        rows = []
-        current_row = []
-        current_width = 0
-        
-        for item in self.item_list:
-            widget = item.widget()
-            if not widget:
-                continue
-                
-            item_width = widget.sizeHint().width()
-            
-            if current_row:
-                new_width = current_width + spacing + item_width
-            else:
-                new_width = item_width
-            
-            # 如果超过可用宽度，换行
-            if current_row and new_width > available_width:
-                rows.append(current_row)
-                current_row = [item]
-                current_width = item_width
-            else:
-                current_row.append(item)
-                current_width = new_width
-        
-        if current_row:
-            rows.append(current_row)
+        rows, row_widths, row_heights, spacing = self._calculate_rows(rect)
+        if not rows:
+            return 0
+        available_width = rect.width()  # 与 _calculate_rows 的换行宽度一致
         
         y = rect.y()
         
         # 布局每一行 - 每行都拉伸到相同的 available_width
-        for row in rows:
-            if not row:
-                continue
-            
-            # 计算这一行的自然宽度
-            row_natural_width = sum(item.widget().sizeHint().width() for item in row if item.widget())
-            row_spacing_width = spacing * (len(row) - 1) if len(row) > 1 else 0
-            
-            # 计算额外宽度并平均分配到每个按钮
-            extra_width = available_width - row_natural_width - row_spacing_width
-            if extra_width > 0 and len(row) > 0:
-                width_per_button = extra_width // len(row)
-                remaining = extra_width % len(row)
-            else:
-                width_per_button = 0
-                remaining = 0
-            
-            # 设置这一行的按钮
-            x = rect.x()
-            row_height = 0
-            
-            for i, item in enumerate(row):
-                widget = item.widget()
-                if not widget:
-                    continue
-                
-                # 计算最终宽度
-                w = widget.sizeHint().width() + width_per_button
-                if i < remaining:
-                    w += 1
-                h = widget.sizeHint().height()
-                
-                if not test_only:
-                    item.setGeometry(QRect(x, y, w, h))
+        for row, row_width, row_height in zip(rows, row_widths, row_heights):
+            if not test_only:
+                # 计算额外宽度并平均分配到每个按钮
+                extra_width = available_width - row_width
+                if extra_width > 0:
+                    width_per_button, remaining = divmod(extra_width, len(row))
+                else:
+                    width_per_button = 0
+                    remaining = 0
                 
-                x += w + spacing
-                row_height = max(row_height, h)
+                # 设置这一行的按钮
+                x = rect.x()
+                for i, (item, item_width, item_height) in enumerate(row):
+                    w = item_width + width_per_button
+                    if i < remaining:
+                        w += 1
+                    item.setGeometry(QRect(x, y, w, item_height))
+                    x += w + spacing
             
             y += row_height + spacing
         
         # 返回总高度
-        total_height = y - rect.y()
-        if rows:
-            total_height -= spacing
-        
-        return total_height
-
+        return y - rect.y() - spacing
@@ -3,7 +3,6 @@
 """
 import sys
 import os
-import json
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
@@ -17,7 +16,7 @@ from PyQt6.QtGui import QFontMetrics
 from .styles import UNDERLINE_INPUT_STYLE, MUTED_LABEL_STYLE, MAIN_STYLESHEET
 
 # 导入核心组件
-from ..core.constants import DownloadState, DEFAULT_SETTINGS
+from ..core.constants import DownloadState, DEFAULT_SETTINGS, MAX_DOWNLOAD_THREADS
 
 # 导入工具函数
 from ..utils.paths import APP_DATA_FILE, CRASH_LOG_FILE
@@ -83,15 +82,12 @@ class DownloaderGUI(QWidget, CreatorButtonsMixin, NamingPanelMixin,
     
     def _load_settings(self) -> dict:
         """加载设置"""
-        if os.path.exists(APP_DATA_FILE):
-            try:
-                with open(APP_DATA_FILE, "r", encoding='utf-8') as f:
-                    app_data = json.load(f)
-                    return {**DEFAULT_SETTINGS, **app_data.get("settings", {})}
-            except:
-                return DEFAULT_SETTINGS.copy()
-        else:
-            return DEFAULT_SETTINGS.copy()
+        # 配置文件只在启动时读取一次，之后使用内存中的副本
+        self._app_data = self._load_app_data()
+        settings = self._app_data.get("settings")
+        if isinstance(settings, dict):
+            return {**DEFAULT_SETTINGS, **settings}
+        return DEFAULT_SETTINGS.copy()
     
     def setup_main_ui(self):
         """设置主UI"""
@@ -414,13 +410,13 @@ class DownloaderGUI(QWidget, CreatorButtonsMixin, NamingPanelMixin,
         self.thread_title_label = QLabel(_("settings.download_threads_label"))
         thread_layout.addWidget(self.thread_title_label)
         
-        self.download_thread_label = QLabel(str(self.settings.get("concurrency", 5)))
+        self.download_thread_label = QLabel(str(self.settings.get("concurrency", DEFAULT_SETTINGS["concurrency"])))
         self.download_thread_label.setMinimumWidth(20)
         thread_layout.addWidget(self.download_thread_label)
         
         self.download_thread_slider = QSlider(Qt.Orientation.Horizontal)
-        self.download_thread_slider.setRange(1, 20)
-        self.download_thread_slider.setValue(self.settings.get("concurrency", 5))
+        self.download_thread_slider.setRange(1, MAX_DOWNLOAD_THREADS)
+        self.download_thread_slider.setValue(self.settings.get("concurrency", DEFAULT_SETTINGS["concurrency"]))
         thread_layout.addWidget(self.download_thread_slider)
         
         self.download_thread_slider.valueChanged.connect(self._handle_download_concurrency_change)
@@ -539,16 +535,13 @@ class DownloaderGUI(QWidget, CreatorButtonsMixin, NamingPanelMixin,
     def save_settings(self):
         """保存设置到配置文件"""
         try:
-            if os.path.exists(APP_DATA_FILE):
-                with open(APP_DATA_FILE, "r", encoding='utf-8') as f:
-                    app_data = json.load(f)
-            else:
-                app_data = {"settings": {}, "creator_urls": [], "creator_info": {}, "version": "1.0.0"}
-            
+            app_data = self._app_data
+            app_data.setdefault("creator_urls", [])
+            app_data.setdefault("creator_info", {})
+            app_data.setdefault("version", "1.0.0")
             app_data["settings"] = self.settings
             
-            with open(APP_DATA_FILE, "w", encoding='utf-8') as f:
-                json.dump(app_data, f, ensure_ascii=False, indent=4)
+            self._persist_app_data()
         except Exception as e:
             print(f"保存设置失败: {e}")
     
@@ -584,8 +577,9 @@ class DownloaderGUI(QWidget, CreatorButtonsMixin, NamingPanelMixin,
             "version": "1.0.0"
         }
         try:
-            with open(APP_DATA_FILE, "w", encoding='utf-8') as f:
-                json.dump(default_data, f, ensure_ascii=False, indent=4)
+            for key, value in default_data.items():
+                self._app_data.setdefault(key, value)
+            self._persist_app_data(immediate=True)
         except Exception as e:
             print(f"创建默认配置文件失败: {e}")
 
@@ -602,6 +596,9 @@ class DownloaderGUI(QWidget, CreatorButtonsMixin, NamingPanelMixin,
     def closeEvent(self, event):
         """处理窗口关闭事件"""
         try:
+            # 写入尚未保存的配置
+            self._flush_app_data()
+            
             if hasattr(self, 'detection_worker') and self.detection_worker and self.detection_worker.isRunning():
                 self.detection_worker.terminate()
                 self.detection_worker.wait(1000)
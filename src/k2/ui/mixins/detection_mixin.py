@@ -1,7 +1,7 @@
 """检测功能混入"""
 import os
 import math
-from PyQt6.QtWidgets import QTreeWidgetItem, QApplication
+from PyQt6.QtWidgets import QTreeWidgetItem
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor, QBrush
 
@@ -75,6 +75,7 @@ class DetectionMixin:
         if self.all_tags is not None:
             self.all_tags.clear()
         self.selected_tags.clear()
+        self._invalidate_tag_index()
         self._clear_tag_buttons()
         self._update_rule_preview()
         self.is_detecting = True
@@ -96,7 +97,6 @@ class DetectionMixin:
     def on_detection_progress_update(self, loaded_count: int, total_count: int):
         """处理检测进度更新"""
         self.progress_panel.show_detecting(loaded_count, total_count)
-        QApplication.processEvents()
     
     def on_detection_finished(self, service: str, creator_id: str, domain_config: dict):
         """检测完成处理"""
@@ -180,6 +180,7 @@ class DetectionMixin:
             
             if creator_tags_with_counts:
                 self.creator_tags_with_counts.update(creator_tags_with_counts)
+            self._invalidate_tag_index()
             
             # 显示数据
             if is_single_post and len(all_posts_for_ui) == 1:
@@ -329,11 +330,13 @@ class DetectionMixin:
                 file_name = file_info['name']
                 file_url = file_info['url']
                 
+                file_ext = os.path.splitext(file_name)[1].lower()
+                
                 child_item = QTreeWidgetItem(item, [file_name])
-                child_item.setData(0, Qt.ItemDataRole.UserRole, {"url": file_url, "name": file_name})
+                # 同时保存扩展名，过滤时无需重新解析文件名
+                child_item.setData(0, Qt.ItemDataRole.UserRole, {"url": file_url, "name": file_name, "ext": file_ext})
                 child_item.setFlags(child_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
                 
-                file_ext = os.path.splitext(file_name)[1].lower()
                 if self.is_ext_match(file_ext, allowed_exts):
                     child_item.setCheckState(0, Qt.CheckState.Checked)
                 else:
@@ -1,10 +1,10 @@
 """下载功能混入"""
 import os
 import threading
-from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtCore import QTimer
 
-from ...core.constants import DownloadState
+from ...core.constants import DownloadState, DEFAULT_SETTINGS
 from ...core.workers import TagFilterDownloadCoordinator
 from ...utils.i18n import _
 
@@ -76,7 +76,7 @@ class DownloadMixin:
             "creator_folder_name_template": self.settings["creator_folder_name_template"],
             "post_folder_name_template": self.settings["post_folder_name_template"],
             "file_name_template": self.settings["file_name_template"],
-            "threads": self.settings.get("concurrency", 5)
+            "threads": self.settings.get("concurrency", DEFAULT_SETTINGS["concurrency"])
         }
         
         self.download_pause_event.clear()
@@ -95,10 +95,10 @@ class DownloadMixin:
             self.download_pause_event,
             self.creator_tags_with_counts,
             start_post_id,
-            end_post_id
+            end_post_id,
+            detected_extensions=frozenset(self.detected_extensions)
         )
         
-        self.tag_filter_coordinator.file_completed.connect(self._on_file_completed)
         self.tag_filter_coordinator.stats_update.connect(self._on_stats_update)
         self.tag_filter_coordinator.finished.connect(self.on_worker_finished)
         self.tag_filter_coordinator.error.connect(self.on_download_error)
@@ -106,10 +106,6 @@ class DownloadMixin:
         self.tag_filter_coordinator.file_progress.connect(self._on_file_progress)
         self.tag_filter_coordinator.start()
     
-    def _on_file_completed(self, url: str):
-        """处理单个文件完成"""
-        pass
-    
     def _on_file_progress(self, downloaded_bytes: int, total_bytes: int, retry_count: int):
         """处理文件下载进度"""
         # 使用当前已下载文件数
@@ -119,15 +115,12 @@ class DownloadMixin:
             (downloaded_bytes, total_bytes),
             retry_count
         )
-        QApplication.processEvents()
     
     def _on_stats_update(self, downloaded_files: int, processed_posts: int):
         """处理下载统计更新"""
         self.current_downloaded_count = downloaded_files
-        progress_text = _("messages.download_progress", downloaded=downloaded_files, processed=processed_posts)
         # 更新进度条（不带当前文件进度，因为小文件下载很快）
         self.progress_panel.show_downloading(downloaded_files, None, None, 0)
-        QApplication.processEvents()
     
     def pause_download(self):
         """暂停下载"""
@@ -8,30 +8,6 @@ UNDERLINE_INPUT_STYLE = "QLineEdit { border: none; border-bottom: 1px solid #ddd
 # 灰色斜体标签样式
 MUTED_LABEL_STYLE = "QLabel { color: #666; font-style: italic; }"
 
-# 扩展名按钮样式
-EXT_BUTTON_DISABLED_STYLE = """
-    QPushButton {
-        color: gray;
-        text-decoration: none;
-        font-weight: normal;
-    }
-"""
-
-EXT_BUTTON_ENABLED_STYLE = """
-    QPushButton {
-        text-decoration: none;
-        font-weight: normal;
-    }
-"""
-
-EXT_BUTTON_DISABLED_FILTER_STYLE = """
-    QPushButton {
-        color: red;
-        text-decoration: line-through;
-        font-weight: normal;
-    }
-"""
-
 # 主应用样式表
 MAIN_STYLESHEET = """
     /* 检测按钮特殊样式 - 无边框，半透明背景，浅白色文本 */
@@ -58,6 +34,22 @@ MAIN_STYLESHEET = """
         color: #999;
     }
     
+    /* 扩展名过滤按钮 - 通过 extState 动态属性切换样式（disabled / on / off） */
+    QPushButton#detectButton[extState="disabled"] {
+        color: gray;
+        text-decoration: none;
+        font-weight: normal;
+    }
+    QPushButton#detectButton[extState="on"] {
+        text-decoration: none;
+        font-weight: normal;
+    }
+    QPushButton#detectButton[extState="off"] {
+        color: red;
+        text-decoration: line-through;
+        font-weight: normal;
+    }
+    
     /* 标签过滤开关按钮 - 与检测按钮形状一致，选中时蓝色高亮 */
     QPushButton#tagFilterToggleButton {
         border: none;
@@ -10,7 +10,11 @@ from .network import (
     extract_post_info,
     extract_creator_info,
     COMMON_HEADERS,
-    DOMAINS
+    DOMAINS,
+    COOMER_SERVICES,
+    build_headers,
+    build_api_headers,
+    backoff_sleep
 )
 from .i18n import _, get_text, set_language, SUPPORTED_LANGUAGES
 from .paths import (
@@ -36,6 +40,10 @@ __all__ = [
     'extract_creator_info',
     'COMMON_HEADERS',
     'DOMAINS',
+    'COOMER_SERVICES',
+    'build_headers',
+    'build_api_headers',
+    'backoff_sleep',
     '_',
     'get_text',
     'set_language',
@@ -1,8 +1,9 @@
 # cache.py - 缓存管理模块
 import json
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from .paths import CREATORS_DIR, get_creator_cache_file, get_creator_dir
 
 
@@ -19,6 +20,12 @@ class CacheManager:
         
         # 待写入的缓存更新（延迟批量写入）
         self._pending_saves = set()  # 记录需要保存的作者
+        
+        # 请求失败的帖子（负缓存，仅当前会话有效）
+        self._missing_posts = {}  # {(service, creator_id, post_id): 过期时间戳}
+        
+        # 近期已向服务器确认过的缓存项（仅当前会话有效），有效期内直接使用本地缓存
+        self._fresh_until = {}  # {(service, creator_id, key): 过期时间戳}
     
     def _get_cache_key(self, service: str, creator_id: str) -> str:
         """生成缓存键"""
@@ -69,7 +76,8 @@ class CacheManager:
                 cache_file = get_creator_cache_file(service, creator_id)
                 try:
                     with open(cache_file, 'w', encoding='utf-8') as f:
-                        json.dump(self._memory_cache[cache_key], f, ensure_ascii=False, indent=2)
+                        # 紧凑格式：帖子列表较大时，缩进会显著增加写入耗时和文件体积
+                        json.dump(self._memory_cache[cache_key], f, ensure_ascii=False, separators=(',', ':'))
                 except (IOError, Exception) as e:
                     print(f"❌ 保存缓存失败 {service}:{creator_id}: {e}")
         else:
@@ -106,6 +114,16 @@ class CacheManager:
         
         return None
     
+    def iter_cached_posts(self, service: str, creator_id: str) -> Iterator[dict]:
+        """逐个产出缓存的帖子数据，不复制整个帖子列表"""
+        cache_data = self._load_creator_cache(service, creator_id)
+        
+        # 检查缓存格式是否有效
+        if not self._is_cache_valid(cache_data.get('cached_at', '')):
+            return
+        
+        yield from cache_data.get('posts', [])
+    
     def update_posts_cache(self, service: str, creator_id: str, new_posts: List[dict], offset: int = 0, delay_save: bool = True):
         """更新帖子缓存（增量更新，支持延迟保存）
         
@@ -235,6 +253,33 @@ class CacheManager:
         self._memory_cache[cache_key] = cache_data
         self._save_creator_cache(service, creator_id, immediate=True)
     
+    # ========== HTTP 验证器缓存 ==========
+    
+    def get_etag(self, service: str, creator_id: str, key: str) -> Optional[str]:
+        """获取指定接口上次响应的 ETag"""
+        cache_data = self._load_creator_cache(service, creator_id)
+        return (cache_data.get('etags') or {}).get(key)
+    
+    def set_etag(self, service: str, creator_id: str, key: str, etag: Optional[str]):
+        """记录指定接口响应的 ETag，随作者缓存一起保存"""
+        if not etag:
+            return
+        cache_data = self._load_creator_cache(service, creator_id)
+        cache_data.setdefault('etags', {})[key] = etag
+        
+        cache_key = self._get_cache_key(service, creator_id)
+        self._memory_cache[cache_key] = cache_data
+        self._save_creator_cache(service, creator_id, immediate=False)
+    
+    def mark_fresh(self, service: str, creator_id: str, key: str, ttl: int = 120):
+        """记录缓存项刚与服务器确认过，ttl 秒内无需再次请求"""
+        self._fresh_until[(service, creator_id, key)] = time.monotonic() + ttl
+    
+    def is_fresh(self, service: str, creator_id: str, key: str) -> bool:
+        """检查缓存项是否处于确认后的有效期内"""
+        expires_at = self._fresh_until.get((service, creator_id, key))
+        return expires_at is not None and expires_at > time.monotonic()
+    
     # ========== 帖子标签映射缓存 ==========
     
     def get_post_tags(self, service: str, creator_id: str, post_id: str) -> Optional[List[str]]:
@@ -248,6 +293,21 @@ class CacheManager:
         
         return None
     
+    def mark_missing(self, service: str, creator_id: str, post_id: str, ttl: int = 3600):
+        """记录获取失败（已删除或不存在）的帖子，ttl 秒内不再请求"""
+        self._missing_posts[(service, creator_id, str(post_id))] = time.monotonic() + ttl
+    
+    def is_missing(self, service: str, creator_id: str, post_id: str) -> bool:
+        """检查帖子是否处于失败记录的有效期内"""
+        key = (service, creator_id, str(post_id))
+        expires_at = self._missing_posts.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._missing_posts[key]
+            return False
+        return True
+    
     # ========== 缓存统计 ==========
     
     def get_cache_stats(self) -> dict:
@@ -311,6 +371,8 @@ class CacheManager:
         # 清理内存缓存
         self._memory_cache.clear()
         self._pending_saves.clear()
+        self._missing_posts.clear()
+        self._fresh_until.clear()
         
         return {'invalid_files': invalid_count}
     
@@ -338,6 +400,8 @@ class CacheManager:
         # 清理内存缓存
         self._memory_cache.clear()
         self._pending_saves.clear()
+        self._missing_posts.clear()
+        self._fresh_until.clear()
         
         return {'status': 'success', 'message': f'已清空 {deleted_count} 个作者的缓存'}
     
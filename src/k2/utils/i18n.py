@@ -13,6 +13,9 @@ CURRENT_LANGUAGE = DEFAULT_LANGUAGE
 # 语言数据缓存
 _language_data: Dict[str, Any] = {}
 
+# 已解析的翻译键缓存 {key: value}，切换语言时清空
+_text_cache: Dict[str, Any] = {}
+
 # 支持的语言列表
 SUPPORTED_LANGUAGES = {
     "zh_CN": "简体中文",
@@ -44,23 +47,28 @@ def set_language(language_code: str):
     
     CURRENT_LANGUAGE = language_code
     _language_data = load_language_data(language_code)
+    _text_cache.clear()
 
 def get_text(key: str, **kwargs) -> str:
     """获取翻译文本"""
     if not _language_data:
         set_language(CURRENT_LANGUAGE)
     
-    # 支持嵌套键，如 "ui.buttons.download"
-    keys = key.split('.')
-    value = _language_data
-    
-    for k in keys:
-        if isinstance(value, dict) and k in value:
-            value = value[k]
-        else:
-            # 如果找不到翻译，返回键名作为后备
-            print(f"警告: 找不到翻译键 '{key}'")
-            return key
+    value = _text_cache.get(key)
+    if value is None:
+        # 支持嵌套键，如 "ui.buttons.download"
+        keys = key.split('.')
+        value = _language_data
+        
+        for k in keys:
+            if isinstance(value, dict) and k in value:
+                value = value[k]
+            else:
+                # 如果找不到翻译，返回键名作为后备
+                print(f"警告: 找不到翻译键 '{key}'")
+                return key
+        
+        _text_cache[key] = value
     
     # 如果值是字符串，支持格式化
     if isinstance(value, str) and kwargs:
@@ -11,10 +11,14 @@ except ImportError:
 import gzip
 import json
 import time
+import random
 import threading
 import locale
 import ctypes
 import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 from fake_useragent import UserAgent
 
 
@@ -23,6 +27,10 @@ _session = None
 _session_lock = threading.Lock()
 _last_pool_size = None
 
+# 缓存的主机连接池数量（API 域名 + 各 CDN 节点 + 外链图床）
+# 连接池按主机区分，每个主机的空闲长连接上限由 pool_maxsize 控制
+POOL_HOSTS = 16
+
 
 def get_session(max_workers=None):
     """获取配置好的Session实例，线程安全
@@ -38,10 +46,12 @@ def get_session(max_workers=None):
     else:
         desired_pool_size = 50
     
-    # 如果连接池大小变化，需要重新创建session
-    should_recreate = (_session is not None and 
+    # 仅在现有连接池不够用时才重新创建session
+    # 连接池够大时继续复用，保留检测阶段建立的长连接（重建会丢弃所有空闲连接）
+    should_recreate = (max_workers is not None and
+                      _session is not None and 
                       _last_pool_size is not None and 
-                      abs(desired_pool_size - _last_pool_size) > 10)
+                      desired_pool_size > _last_pool_size)
     
     if _session is None or should_recreate:
         with _session_lock:
@@ -60,9 +70,9 @@ def get_session(max_workers=None):
                     backoff_factor=1
                 )
                 
-                # 动态配置连接池
+                # 动态配置连接池：每个主机保留足够多的空闲长连接，复用时省去 TCP/TLS 握手
                 adapter = HTTPAdapter(
-                    pool_connections=desired_pool_size,
+                    pool_connections=POOL_HOSTS,
                     pool_maxsize=desired_pool_size,
                     max_retries=retry_strategy
                 )
@@ -90,7 +100,11 @@ DOMAINS = {
     }
 }
 
+# 托管在 coomer 上的服务，其余服务均在 kemono
+COOMER_SERVICES = frozenset(('onlyfans', 'fansly', 'candfans'))
+
 
+@lru_cache(maxsize=256)
 def get_domain_config(url: str) -> dict:
     """根据 URL 确定并返回对应的域名配置"""
     if 'coomer.st' in url:
@@ -127,7 +141,24 @@ COMMON_HEADERS = {
 }
 
 
+@lru_cache(maxsize=8)
+def build_headers(referer: str) -> Mapping[str, str]:
+    """返回带 Referer 的通用请求头（只读，按 referer 缓存，避免每次请求复制字典）"""
+    return MappingProxyType({**COMMON_HEADERS, "Referer": referer})
+
+
+@lru_cache(maxsize=8)
+def build_api_headers(referer: str) -> Mapping[str, str]:
+    """返回 JSON API 请求头（只读，按 referer 缓存）"""
+    return MappingProxyType({
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json",
+        "Referer": referer
+    })
+
+
 # === URL 解析 ===
+# 解析结果只依赖 URL 字符串，使用 lru_cache 缓存（抛出 ValueError 的结果不会被缓存）
 POST_URL_RE = re.compile(
     r"https?://[^/]+/(?P<service>[^/]+)/user/(?P<creator_id>[^/]+)/post/(?P<post_id>\d+)"
 )
@@ -137,6 +168,7 @@ CREATOR_URL_RE = re.compile(
 )
 
 
+@lru_cache(maxsize=256)
 def extract_post_info(url: str) -> tuple[str, str, str]:
     """从帖子 URL 中提取服务、创作者和帖子 ID"""
     match = POST_URL_RE.search(url)
@@ -149,6 +181,7 @@ def extract_post_info(url: str) -> tuple[str, str, str]:
     )
 
 
+@lru_cache(maxsize=256)
 def extract_creator_info(url: str) -> tuple[str, str]:
     """从创作者 URL 中提取服务和创作者 ID"""
     match = CREATOR_URL_RE.search(url)
@@ -161,22 +194,48 @@ def extract_creator_info(url: str) -> tuple[str, str]:
 
 
 # === HTTP请求 ===
-def make_robust_request(url: str, headers: dict, max_retries: int = 3, timeout: int = 30) -> requests.Response | None:
+def backoff_sleep(prev: float = None, cap: float = 60, base: float = 1.0) -> float:
+    """按去相关抖动（decorrelated jitter）策略等待后重试
+    
+    多个线程同时失败时，随机化的等待时间可以错开重试，避免同时冲击服务器。
+    
+    Args:
+        prev: 上一次的等待时间（首次重试传 None）
+        cap: 最长等待时间（秒）
+        base: 最短等待时间（秒）
+        
+    Returns:
+        本次等待的时间，供下一次调用传入
+    """
+    sleep_time = min(cap, random.uniform(base, (prev or base) * 3))
+    time.sleep(sleep_time)
+    return sleep_time
+
+
+def make_robust_request(url: str, headers: Mapping[str, str], max_retries: int = 3, timeout: int = 30) -> requests.Response | None:
     """发送一个健壮的 HTTP GET 请求，支持重试和退避
     
     Returns:
-        成功时返回 Response 对象，失败时返回 None（不抛出异常）
+        成功时返回 Response 对象（携带 If-None-Match 时可能为 304）；
+        404 时直接返回该响应（不重试，布尔值为假），其他失败返回 None（不抛出异常）
     """
     session = get_session()
-    local_headers = headers.copy()
+    local_headers = headers  # 只读，仅在需要改写时复制
+    backoff = None
     for attempt in range(max_retries):
         try:
             response = session.get(url, headers=local_headers, timeout=timeout)
             if response.status_code == 200:
                 return response
+            elif response.status_code == 304:
+                # 条件请求命中，内容未变化（无响应体），由调用方使用本地缓存
+                return response
+            elif response.status_code == 404:
+                # 资源不存在，重试无意义；返回响应供调用方区分“不存在”和临时失败
+                return response
             elif response.status_code == 403:
                 # 数据请求被拒绝，尝试备用请求头
-                local_headers["Accept"] = "text/css"
+                local_headers = {**headers, "Accept": "text/css"}
                 response = session.get(url, headers=local_headers, timeout=timeout)
                 if response.status_code == 200:
                     return response
@@ -190,8 +249,7 @@ def make_robust_request(url: str, headers: dict, max_retries: int = 3, timeout:
         
         # 准备重试
         if attempt < max_retries - 1:  # 不是最后一次尝试
-            sleep_time = 2 ** attempt
-            time.sleep(sleep_time)
+            backoff = backoff_sleep(backoff)
     
     return None
 
@@ -0,0 +1,54 @@
+"""帖子文件检测的去重测试"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from k2.core.detector import detect_files_from_post  # noqa: E402
+
+
+ALL_SOURCES = {"file", "attachments", "content"}
+
+
+def _urls(post):
+    _info, files = detect_files_from_post(post, "kemono.su", set(), ALL_SOURCES)
+    return [f["url"] for f in files]
+
+
+class DetectFilesDedupTest(unittest.TestCase):
+    def test_path_case_is_not_merged(self):
+        post = {"id": "1", "attachments": [
+            {"path": "/data/ab/cd/File.png", "name": "File.png"},
+            {"path": "/data/ab/cd/file.png", "name": "file.png"},
+        ]}
+        self.assertEqual(len(_urls(post)), 2)
+
+    def test_query_only_difference_is_not_merged(self):
+        post = {"id": "1", "content": (
+            '<img src="https://example.com/dl?f=1.png">'
+            '<img src="https://example.com/dl?f=2.png">'
+        )}
+        self.assertEqual(_urls(post), ["https://example.com/dl?f=1.png", "https://example.com/dl?f=2.png"])
+
+    def test_site_prefix_and_size_param_are_merged(self):
+        post = {
+            "id": "1",
+            "attachments": [{"path": "/data/ab/cd/hash.png", "name": "a.png"}],
+            "content": '<img src="https://kemono.su/data/ab/cd/hash.png?w=400">',
+        }
+        self.assertEqual(_urls(post), ["https://kemono.su/data/ab/cd/hash.png"])
+
+    def test_mixed_quoted_and_unquoted_img_src(self):
+        post = {"id": "1", "content": (
+            '<p><img src="/data/aa/bb/quoted.png"></p>'
+            '<p><img src=/data/cc/dd/unquoted.png></p>'
+        )}
+        self.assertEqual(_urls(post), [
+            "https://kemono.su/data/aa/bb/quoted.png",
+            "https://kemono.su/data/cc/dd/unquoted.png",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""大文件下载名额测试"""
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from k2.core import downloader  # noqa: E402
+from k2.core.downloader import LargeFileGate  # noqa: E402
+
+
+THRESHOLD = 100
+BIG = THRESHOLD + 1
+
+
+class LargeFileGateTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(downloader, "LARGE_FILE_WAIT_POLL", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.gate = LargeFileGate(THRESHOLD)
+        self.cancel = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+
+    def _fake_download(self, hold):
+        """模拟 download_file：收到响应头后按 hold 事件保持下载状态"""
+        def fake(url, dest_path, headers, cancel_event=None, on_headers=None, **kwargs):
+            with self.lock:
+                self.requests += 1
+            on_headers(BIG)
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                while not hold.wait(0.01):
+                    if cancel_event.is_set():
+                        raise InterruptedError
+            finally:
+                with self.lock:
+                    self.active -= 1
+            return dest_path, None
+        return fake
+
+    def _start(self, name, results):
+        def run():
+            try:
+                results[name] = self.gate.download("u", name, {}, cancel_event=self.cancel)
+            except InterruptedError:
+                results[name] = "interrupted"
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def test_large_files_download_one_at_a_time(self):
+        hold = threading.Event()
+        results = {}
+        with mock.patch.object(downloader, "download_file", self._fake_download(hold)):
+            first = self._start("a", results)
+            second = self._start("b", results)
+            threading.Timer(0.2, hold.set).start()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(results, {"a": ("a", None), "b": ("b", None)})
+        self.assertEqual(self.max_active, 1)
+        # 等待名额的一方放弃了首次请求，获得名额后重新请求
+        self.assertEqual(self.requests, 3)
+
+    def test_cancel_releases_waiting_download(self):
+        hold = threading.Event()
+        results = {}
+        with mock.patch.object(downloader, "download_file", self._fake_download(hold)):
+            first = self._start("a", results)
+            while self.active == 0:
+                threading.Event().wait(0.01)
+            second = self._start("b", results)
+            threading.Event().wait(0.1)
+            self.cancel.set()
+            second.join(2)
+            first.join(2)
+
+        self.assertFalse(second.is_alive())
+        self.assertFalse(first.is_alive())
+        self.assertEqual(results, {"a": "interrupted", "b": "interrupted"})
+        self.assertEqual(self.max_active, 1)
+
+    def test_on_release_runs_while_slot_is_held(self):
+        hold = threading.Event()
+        hold.set()
+        slot_free_in_callback = []
+
+        def on_release():
+            acquired = self.gate._semaphore.acquire(blocking=False)
+            if acquired:
+                self.gate._semaphore.release()
+            slot_free_in_callback.append(acquired)
+
+        with mock.patch.object(downloader, "download_file", self._fake_download(hold)):
+            result = self.gate.download("u", "a", {}, cancel_event=self.cancel, on_release=on_release)
+
+        self.assertEqual(result, ("a", None))
+        self.assertEqual(slot_free_in_callback, [False])
+
+
+if __name__ == "__main__":
+    unittest.main()